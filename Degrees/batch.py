@@ -0,0 +1,106 @@
+import csv
+import json
+import sys
+
+from graph import load_graph
+from util import pool_context, workers_option
+
+# Graph shared with the worker processes. Loaded before the pool starts,
+# so forked workers inherit it instead of loading their own copy.
+graph = None
+
+
+def main():
+    args = sys.argv[1:]
+    workers = workers_option(args)
+    if len(args) > 2:
+        sys.exit("Usage: python batch.py [directory] [pairs.csv] [--workers N]")
+    directory = args[0] if len(args) >= 1 else "large"
+
+    global graph
+    graph = load_graph(directory)
+
+    if len(args) == 2 and args[1] != "-":
+        with open(args[1], encoding="utf-8") as f:
+            groups, errors = group_pairs(f)
+    else:
+        groups, errors = group_pairs(sys.stdin)
+
+    out = sys.stdout
+    for error in errors:
+        out.write(json.dumps(error) + "\n")
+    for line in run(groups, directory, workers):
+        out.write(line)
+
+
+def group_pairs(lines):
+    """
+    Reads (source, target) pairs, one per CSV line, where each side is a
+    person id or a name. A name shared by several people is reported as
+    ambiguous, and a name matching no one resolves to the closest
+    indexed name.
+
+    Returns a dictionary mapping each source person id to a list of
+    (source, target, target person id) entries, and a list of error
+    records for pairs that could not be resolved.
+    """
+    groups = {}
+    errors = []
+    for row in csv.reader(lines):
+        if not row or row[0].startswith("#"):
+            continue
+        if len(row) != 2:
+            errors.append({"pair": row, "error": "expected source,target"})
+            continue
+        source, target = (field.strip() for field in row)
+        source_id, target_id = graph.resolve(source), graph.resolve(target)
+        if source_id is None or target_id is None:
+            missing = source if source_id is None else target
+            error = {"source": source, "target": target,
+                     "error": f"person not found: {missing}"}
+            person_ids = graph.ids_for_name(missing)
+            if person_ids:
+                error.update(error=f"ambiguous name: {missing}", ids=person_ids)
+            errors.append(error)
+            continue
+        groups.setdefault(source_id, []).append((source, target, target_id))
+    return groups, errors
+
+
+def run(groups, directory, workers=None):
+    """
+    Answers every group with one search per source, spread over a pool
+    of processes, and yields one JSON line per pair as results arrive.
+    """
+    with pool_context().Pool(workers, initializer=_init_worker, initargs=(directory,)) as pool:
+        for lines in pool.imap_unordered(answer_group, groups.items(), chunksize=4):
+            yield from lines
+
+
+def _init_worker(directory):
+    # Spawned workers do not inherit the graph; they open the snapshot
+    global graph
+    if graph is None:
+        graph = load_graph(directory)
+
+
+def answer_group(group):
+    """
+    Returns the JSON lines for every pair sharing one source.
+    """
+    source_id, pairs = group
+    paths = graph.shortest_paths(source_id, {target_id for _, _, target_id in pairs})
+    lines = []
+    for source, target, target_id in pairs:
+        path = paths[target_id]
+        lines.append(json.dumps({
+            "source": source,
+            "target": target,
+            "degrees": None if path is None else len(path),
+            "path": path
+        }) + "\n")
+    return lines
+
+
+if __name__ == "__main__":
+    main()
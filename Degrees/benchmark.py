@@ -0,0 +1,129 @@
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import degrees
+from graph import SNAPSHOT, CostarGraph, csv_fingerprint, load_snapshot, write_snapshot
+
+
+def main():
+    args = sys.argv[1:]
+    options = {"--queries": 20, "--seed": 0}
+    output = "benchmark.json"
+    if "--output" in args:
+        position = args.index("--output")
+        if position + 1 >= len(args):
+            sys.exit("--output needs a file name")
+        output = args[position + 1]
+        del args[position:position + 2]
+    for option in options:
+        if option in args:
+            position = args.index(option)
+            try:
+                options[option] = int(args[position + 1])
+            except (IndexError, ValueError):
+                sys.exit(f"{option} needs a number")
+            del args[position:position + 2]
+    if len(args) != 1:
+        sys.exit("Usage: python benchmark.py directory "
+                 "[--queries N] [--seed N] [--output results.json]")
+
+    results = run(args[0], options["--queries"], options["--seed"])
+    with open(output, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+    for name, result in results["phases"].items():
+        line = f"  {name:<28} {result['seconds'] * 1000:10.1f} ms"
+        if "peak_bytes" in result:
+            line += f"  peak {result['peak_bytes'] / 2 ** 20:8.1f} MiB"
+        if "expanded" in result:
+            line += f"  expanded {result['expanded']}"
+        print(line)
+    print(f"Results written to {output}")
+
+
+def run(directory, queries=20, seed=0):
+    """
+    Times loading and searching one data directory over a fixed,
+    seeded set of queries.
+
+    Returns a dictionary of phases, each with its wall time in seconds,
+    peak traced memory in bytes for the loading phases, and the nodes
+    expanded by the search phases.
+    """
+    phases = {}
+
+    phases["graph_from_csv"] = measure(lambda: CostarGraph.from_csv(directory), memory=True)
+    fingerprint = csv_fingerprint(directory)
+    graph = CostarGraph.from_csv(directory)
+    phases["write_snapshot"] = measure(lambda: write_snapshot(graph, directory, fingerprint))
+    phases["load_snapshot"] = measure(lambda: load_snapshot(directory), memory=True)
+    phases["load_data"] = measure(lambda: _load_data(directory), memory=True)
+    _load_data(directory)
+
+    # Fixed query sets: sorted ids sampled with a seeded generator
+    rng = random.Random(seed)
+    person_ids = sorted(degrees.people)
+    sample = [rng.choice(person_ids) for _ in range(queries * 50)]
+    pairs = [(rng.choice(person_ids), rng.choice(person_ids)) for _ in range(queries)]
+
+    phases["neighbors_for_person"] = measure(
+        lambda: [degrees.neighbors_for_person(person_id) for person_id in sample]
+    )
+    phases["neighbors_for_person"]["calls"] = len(sample)
+
+    snapshot = load_snapshot(directory)
+    searches = {
+        "shortest_path": degrees.shortest_path,
+        "shortest_path_bidirectional": degrees.shortest_path_bidirectional,
+        "compact_shortest_path": snapshot.shortest_path,
+    }
+    for name, search in searches.items():
+        stats = {"expanded": 0}
+        phases[name] = measure(
+            lambda: [search(source, target, stats) for source, target in pairs]
+        )
+        phases[name]["expanded"] = stats["expanded"]
+        phases[name]["calls"] = len(pairs)
+
+    return {
+        "directory": directory,
+        "people": len(degrees.people),
+        "movies": len(degrees.movies),
+        "stars": sum(len(person["movies"]) for person in degrees.people.values()),
+        "snapshot_bytes": os.path.getsize(os.path.join(directory, SNAPSHOT)),
+        "queries": queries,
+        "seed": seed,
+        "phases": phases,
+    }
+
+
+def measure(function, memory=False):
+    """
+    Times one call of `function`. With `memory=True` it is called again
+    under tracemalloc to record its peak allocation without slowing the
+    timed call.
+    """
+    start = time.perf_counter()
+    function()
+    result = {"seconds": time.perf_counter() - start}
+    if memory:
+        tracemalloc.start()
+        function()
+        result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def _load_data(directory):
+    # Start from empty dictionaries so every load does the full work
+    degrees.names.clear()
+    degrees.people.clear()
+    degrees.movies.clear()
+    degrees.load_data(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+import sys
+import time
+
+from util import (FastQueueFrontier, FastStackFrontier, Node,
+                  PriorityFrontier, QueueFrontier, StackFrontier)
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python benchmark_frontiers.py [size]")
+    size = int(sys.argv[1]) if len(sys.argv) == 2 else 20000
+
+    print(f"{size} nodes per run")
+    for frontier_class in (StackFrontier, FastStackFrontier,
+                           QueueFrontier, FastQueueFrontier, PriorityFrontier):
+        elapsed = run(frontier_class, size)
+        print(f"  {frontier_class.__name__:<18} {elapsed * 1000:9.1f} ms")
+
+
+def run(frontier_class, size):
+    """
+    Times a BFS-like workload: every node is checked with
+    `contains_state` before it is added, then all nodes are removed.
+    """
+    nodes = [Node(state=i, parent=None, action=None) for i in range(size)]
+    frontier = frontier_class()
+    start = time.perf_counter()
+    for node in nodes:
+        if not frontier.contains_state(node.state):
+            frontier.add(node)
+    while not frontier.empty():
+        frontier.remove()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    main()
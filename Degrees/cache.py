@@ -0,0 +1,163 @@
+import sys
+from collections import OrderedDict, deque
+
+# Rough bytes held per explored person: a dict slot, a (parent, movie)
+# tuple and its two ints
+_ENTRY_BYTES = 120
+# Bytes per person id waiting in a tree's queue
+_QUEUE_BYTES = 8
+
+
+class BFSTree():
+    """
+    Breadth-first search tree from one source person index that can be
+    paused once a target is found and resumed later for a farther one.
+    """
+
+    def __init__(self, source):
+        self.source = source
+        # Maps each reached person to (parent person, movie) indices
+        self.parents = {source: None}
+        # Reached people whose neighbors have not been expanded yet
+        self.queue = deque([source])
+        self.expanded = 0
+
+    @property
+    def complete(self):
+        return not self.queue
+
+    def nbytes(self):
+        """
+        Returns an estimate of the memory held by the tree.
+        """
+        return (sys.getsizeof(self.parents)
+                + len(self.parents) * _ENTRY_BYTES
+                + len(self.queue) * _QUEUE_BYTES)
+
+    def grow(self, graph, target):
+        """
+        Expands the tree until it reaches the person index `target` or
+        runs out of people. Every person taken off the queue is fully
+        expanded, so growing can always resume where it stopped.
+        """
+        parents, queue = self.parents, self.queue
+        person_offsets, person_movies = graph.person_offsets, graph.person_movies
+        movie_offsets, movie_people = graph.movie_offsets, graph.movie_people
+        while queue and target not in parents:
+            person = queue.popleft()
+            self.expanded += 1
+            for k in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[k]
+                for m in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    neighbor = movie_people[m]
+                    if neighbor not in parents:
+                        parents[neighbor] = (person, movie)
+                        queue.append(neighbor)
+
+    def path(self, graph, target):
+        """
+        Returns the (movie_id, person_id) pairs from the source to the
+        person index `target` by walking parent pointers, or None if
+        the tree has not reached it.
+        """
+        if target not in self.parents:
+            return None
+        path = []
+        person = target
+        while self.parents[person] is not None:
+            parent, movie = self.parents[person]
+            path.append((graph.movie_ids[movie], graph.person_ids[person]))
+            person = parent
+        path.reverse()
+        return path
+
+
+class BFSTreeCache():
+    """
+    Bounded LRU cache of breadth-first search trees keyed by source.
+
+    A repeated source is answered by walking parent pointers, and a
+    target beyond the explored radius resumes the cached tree. Trees are
+    evicted least recently used first once their estimated size passes
+    `max_bytes`.
+    """
+
+    def __init__(self, graph, max_bytes=256 * 2 ** 20):
+        self.graph = graph
+        self.max_bytes = max_bytes
+        self.trees = OrderedDict()
+        self.sizes = {}
+        self.total_bytes = 0
+        self.hits = 0
+        self.resumes = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def shortest_path(self, source, target, stats=None):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target person ids.
+
+        If no possible path, returns None.
+        If `stats` is given, stats["expanded"] counts the nodes expanded.
+        """
+        s, t = self.graph.person_index[source], self.graph.person_index[target]
+        tree = self.trees.get(s)
+        if tree is None:
+            self.misses += 1
+            tree = BFSTree(s)
+            self.trees[s] = tree
+        else:
+            self.trees.move_to_end(s)
+            if t in tree.parents or tree.complete:
+                self.hits += 1
+            else:
+                self.resumes += 1
+
+        expanded = tree.expanded
+        tree.grow(self.graph, t)
+        if stats is not None:
+            stats["expanded"] = stats.get("expanded", 0) + tree.expanded - expanded
+        path = tree.path(self.graph, t)
+
+        self._resize(s, tree)
+        return path
+
+    def _resize(self, source, tree):
+        self.total_bytes -= self.sizes.get(source, 0)
+        self.sizes[source] = tree.nbytes()
+        self.total_bytes += self.sizes[source]
+        while self.trees and self.total_bytes > self.max_bytes:
+            evicted, _ = self.trees.popitem(last=False)
+            self.total_bytes -= self.sizes.pop(evicted)
+            self.evictions += 1
+
+    def invalidate(self, people):
+        """
+        Drops every tree that has reached one of the person indices in
+        `people`, whose co-stars changed, and returns how many were dropped.
+        """
+        stale = [source for source, tree in self.trees.items()
+                 if any(person in tree.parents for person in people)]
+        for source in stale:
+            del self.trees[source]
+            self.total_bytes -= self.sizes.pop(source)
+        return len(stale)
+
+    def clear(self):
+        self.trees.clear()
+        self.sizes.clear()
+        self.total_bytes = 0
+
+    def counters(self):
+        """
+        Returns the hit/miss counters and current size of the cache.
+        """
+        return {
+            "hits": self.hits,
+            "resumes": self.resumes,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "trees": len(self.trees),
+            "bytes": self.total_bytes,
+        }
@@ -0,0 +1,89 @@
+import asyncio
+import csv
+import json
+import random
+import sys
+import time
+
+from server import HOST, PORT, percentile
+
+
+def main():
+    args = sys.argv[1:]
+    options = {"--connections": 8, "--requests": 1000, "--port": PORT}
+    for option in options:
+        if option in args:
+            position = args.index(option)
+            try:
+                options[option] = int(args[position + 1])
+            except (IndexError, ValueError):
+                sys.exit(f"{option} needs a number")
+            del args[position:position + 2]
+    if len(args) != 1:
+        sys.exit("Usage: python client.py pairs.csv "
+                 "[--connections N] [--requests N] [--port N]")
+
+    with open(args[0], encoding="utf-8") as f:
+        pairs = [row for row in csv.reader(f) if len(row) == 2 and not row[0].startswith("#")]
+    if not pairs:
+        sys.exit("No source,target pairs found.")
+
+    report = asyncio.run(load_test(pairs, options["--port"],
+                                   options["--connections"], options["--requests"]))
+    print(json.dumps(report, indent=2))
+
+
+async def load_test(pairs, port, connections, requests):
+    """
+    Sends `requests` path queries drawn from `pairs` over `connections`
+    concurrent connections and returns throughput, client-side latency
+    percentiles and the server's own counters.
+    """
+    latencies = []
+    errors = 0
+    per_connection = [requests // connections + (k < requests % connections)
+                      for k in range(connections)]
+
+    async def worker(count, seed):
+        nonlocal errors
+        rng = random.Random(seed)
+        reader, writer = await asyncio.open_connection(HOST, port)
+        for _ in range(count):
+            source, target = rng.choice(pairs)
+            start = time.perf_counter()
+            response = await request(reader, writer, op="path", source=source, target=target)
+            latencies.append(time.perf_counter() - start)
+            if "error" in response:
+                errors += 1
+        writer.close()
+        await writer.wait_closed()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(count, seed) for seed, count in enumerate(per_connection)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(HOST, port)
+    server_stats = await request(reader, writer, op="stats")
+    writer.close()
+    await writer.wait_closed()
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "server": server_stats.get("stats"),
+    }
+
+
+async def request(reader, writer, **fields):
+    writer.write(json.dumps(fields).encode() + b"\n")
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+if __name__ == "__main__":
+    main()
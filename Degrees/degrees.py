@@ -1,7 +1,11 @@
 import csv
 import sys
+from collections import deque
 
-from util import Node, QueueFrontier
+from graph import (CostarGraph, csv_fingerprint, load_graph, load_snapshot,
+                   snapshot_is_fresh, write_snapshot)
+from namesearch import NameSearch
+from util import FastQueueFrontier, Node
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,11 +16,21 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Sorted name index for prefix and fuzzy lookups, built by load_data
+name_search = None
+
 
 def load_data(directory):
     """
     Load data from CSV files into memory.
+    Builds `name_search` over the loaded names.
+
+    Also writes a binary snapshot of the data next to the CSV files,
+    unless an up to date one is already there.
     """
+    # Taken first, so rows appended while loading are not marked as read
+    fingerprint = csv_fingerprint(directory)
+
     # Load people
     with open(f"{directory}/people.csv", encoding="utf-8") as f:
         reader = csv.DictReader(f)
@@ -51,15 +65,78 @@ def load_data(directory):
             except KeyError:
                 pass
 
+    global name_search
+    name_search = NameSearch.from_people(people)
+
+    # Later runs can memory-map the snapshot instead of parsing the CSVs
+    if not snapshot_is_fresh(directory):
+        try:
+            write_snapshot(CostarGraph.from_data(people, movies), directory, fingerprint)
+        except OSError:
+            pass
+
+
+def apply_delta(people_rows=(), movie_rows=(), star_rows=()):
+    """
+    Add rows shaped like those of people.csv, movies.csv and stars.csv
+    to the data already in memory, without reloading the files.
+
+    Returns the set of person_ids whose co-stars changed.
+    """
+    for row in people_rows:
+        if row["id"] in people:
+            continue
+        people[row["id"]] = {
+            "name": row["name"],
+            "birth": row["birth"],
+            "movies": set()
+        }
+        names.setdefault(row["name"].lower(), set()).add(row["id"])
+        if name_search is not None:
+            name_search.add(row["name"], row["id"])
+
+    for row in movie_rows:
+        if row["id"] not in movies:
+            movies[row["id"]] = {
+                "title": row["title"],
+                "year": row["year"],
+                "stars": set()
+            }
+
+    touched = set()
+    for row in star_rows:
+        try:
+            person, movie = people[row["person_id"]], movies[row["movie_id"]]
+        except KeyError:
+            continue
+        if row["movie_id"] not in person["movies"]:
+            person["movies"].add(row["movie_id"])
+            movie["stars"].add(row["person_id"])
+            touched.update(movie["stars"])
+    return touched
+
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    global names, people, movies, name_search
+    args = sys.argv[1:]
+    flags = {arg for arg in args if arg.startswith("--")}
+    args = [arg for arg in args if not arg.startswith("--")]
+    if len(args) > 1 or not flags <= {"--bidirectional", "--compact"}:
+        sys.exit("Usage: python degrees.py [directory] [--bidirectional] [--compact]")
+    directory = args[0] if len(args) == 1 else "large"
+    bidirectional = "--bidirectional" in flags
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    graph = load_snapshot(directory)
+    if graph is None and "--compact" in flags:
+        graph = load_graph(directory)
+    if graph is not None:
+        # Serve the module-level lookups from the compact graph
+        names, people, movies = graph.names, graph.people, graph.movies
+        name_search = graph.name_search
+    else:
+        load_data(directory)
     print("Data loaded.")
 
     source = person_id_for_name(input("Name: "))
@@ -69,7 +146,14 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    stats = {"expanded": 0}
+    if bidirectional:
+        path = shortest_path_bidirectional(source, target, stats)
+    elif graph is not None:
+        path = graph.shortest_path(source, target, stats)
+    else:
+        path = shortest_path(source, target, stats)
+    print(f"{stats['expanded']} nodes expanded.")
 
     if path is None:
         print("Not connected.")
@@ -84,17 +168,18 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, stats=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
+    If `stats` is given, stats["expanded"] counts the nodes expanded.
     """
     # Initialising node, frontier, explored_set
     # Here, node.state is the actor id and node.action is the movie id
     initial_node = Node(state=source,parent=None,action=None)
-    frontier = QueueFrontier()
+    frontier = FastQueueFrontier()
     frontier.add(initial_node)
     explored_set = set()
     while True :
@@ -105,6 +190,8 @@ def shortest_path(source, target):
         # if frontier is not empty, remove a node and add to explored set
         node = frontier.remove()
         explored_set.add(node.state)
+        if stats is not None:
+            stats["expanded"] = stats.get("expanded", 0) + 1
         # if goal is reached, find the (movie_id, person_id) pairs and return it in a list
         if node.state == target :
             actors_l = list()
@@ -122,12 +209,99 @@ def shortest_path(source, target):
                     frontier.add(co_stars)
 
 
+def shortest_path_bidirectional(source, target, stats=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching from both ends.
+
+    One breadth-first layer is expanded at a time, always on the side
+    with the smaller frontier, until the two searches meet.
+
+    If no possible path, returns None.
+    If `stats` is given, stats["expanded"] counts the nodes expanded.
+    """
+    if source == target:
+        return []
+
+    # Each side maps a person to (movie_id, person_id) of the step
+    # that leads back towards where that side started
+    forward = {source: None}
+    backward = {target: None}
+    forward_frontier = deque([source])
+    backward_frontier = deque([target])
+
+    while forward_frontier and backward_frontier:
+        if len(forward_frontier) <= len(backward_frontier):
+            meeting = _expand_layer(forward_frontier, forward, backward, stats)
+        else:
+            meeting = _expand_layer(backward_frontier, backward, forward, stats)
+        if meeting is not None:
+            break
+    else:
+        return None
+
+    # Walk back to the source, then forward to the target
+    path = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        movie_id, parent_id = forward[person_id]
+        path.append((movie_id, person_id))
+        person_id = parent_id
+    path.reverse()
+    person_id = meeting
+    while backward[person_id] is not None:
+        movie_id, person_id = backward[person_id]
+        path.append((movie_id, person_id))
+    return path
+
+
+def _expand_layer(frontier, parents, other_parents, stats):
+    """
+    Expands every node of one breadth-first layer of `frontier`.
+
+    Returns the meeting person closest to the other side's start if
+    the layer touched the other search, otherwise None.
+    """
+    meeting, best = None, None
+    for _ in range(len(frontier)):
+        person_id = frontier.popleft()
+        if stats is not None:
+            stats["expanded"] = stats.get("expanded", 0) + 1
+        for movie_id, neighbor_id in neighbors_for_person(person_id):
+            if neighbor_id in parents:
+                continue
+            parents[neighbor_id] = (movie_id, person_id)
+            frontier.append(neighbor_id)
+            if neighbor_id in other_parents:
+                distance = _depth(other_parents, neighbor_id)
+                if best is None or distance < best:
+                    meeting, best = neighbor_id, distance
+    return meeting
+
+
+def _depth(parents, person_id):
+    """
+    Returns the number of steps from `person_id` back to its search root.
+    """
+    depth = 0
+    while parents[person_id] is not None:
+        person_id = parents[person_id][1]
+        depth += 1
+    return depth
+
+
 def person_id_for_name(name):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
     person_ids = list(names.get(name.lower(), set()))
+    if len(person_ids) == 0 and name_search is not None:
+        # Fall back to the closest indexed name
+        person_id = name_search.resolve(name)
+        if person_id is not None:
+            print(f"Using closest match: {people[person_id]['name']}")
+        return person_id
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
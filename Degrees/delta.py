@@ -0,0 +1,104 @@
+import csv
+import io
+import os
+import sys
+
+from graph import CSV_FILES, csv_fingerprint, load_snapshot, snapshot_fingerprint, write_snapshot
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python delta.py directory")
+    directory = sys.argv[1]
+
+    graph = load_snapshot(directory, check=False)
+    if graph is None:
+        sys.exit("No snapshot to update; run degrees.py first.")
+    touched = refresh(graph, directory)
+    if touched is None:
+        sys.exit("CSV files were rewritten, not appended to; a full reload is needed.")
+    print(f"Snapshot updated, {len(touched)} people affected.")
+
+
+def apply(graph, people_rows=(), movie_rows=(), star_rows=(), caches=()):
+    """
+    Adds rows shaped like those of the CSV files to an in-memory graph
+    and drops every cached search tree the new links could shorten.
+
+    Returns the set of person indices whose co-stars changed.
+    """
+    touched = graph.apply_delta(people_rows, movie_rows, star_rows)
+    for cache in caches:
+        cache.invalidate(touched)
+    return touched
+
+
+def read_delta(directory):
+    """
+    Reads people.csv, movies.csv and stars.csv from a directory of new
+    rows. Missing files are treated as empty.
+
+    Returns (people_rows, movie_rows, star_rows).
+    """
+    rows = []
+    for filename in CSV_FILES:
+        try:
+            with open(os.path.join(directory, filename), encoding="utf-8") as f:
+                rows.append(list(csv.DictReader(f)))
+        except FileNotFoundError:
+            rows.append([])
+    return tuple(rows)
+
+
+def read_appended(directory, fingerprint=None):
+    """
+    Reads the rows appended to the directory's CSV files since its
+    snapshot was written, using the file sizes stamped in the snapshot.
+    Given a csv_fingerprint, reads only up to the sizes in it.
+
+    Returns (people_rows, movie_rows, star_rows), or None if there is no
+    snapshot or a file shrank, meaning it was rewritten rather than
+    appended to.
+    """
+    stamped = snapshot_fingerprint(directory)
+    if stamped is None:
+        return None
+    rows = []
+    for k, filename in enumerate(CSV_FILES):
+        path = os.path.join(directory, filename)
+        with open(path, "rb") as f:
+            header = f.readline()
+            if os.fstat(f.fileno()).st_size < stamped[2 * k]:
+                return None
+            f.seek(stamped[2 * k])
+            if fingerprint is None:
+                appended = f.read()
+            else:
+                appended = f.read(max(0, fingerprint[2 * k] - stamped[2 * k]))
+        reader = csv.DictReader(io.StringIO(appended.decode("utf-8")),
+                                fieldnames=next(csv.reader([header.decode("utf-8-sig")])))
+        rows.append(list(reader))
+    return tuple(rows)
+
+
+def refresh(graph, directory, caches=()):
+    """
+    Brings a graph opened from the directory's snapshot up to date with
+    rows appended to its CSV files, then rewrites the snapshot.
+
+    Returns the set of person indices whose co-stars changed, or None if
+    the files were rewritten and need a full reload.
+    """
+    fingerprint = csv_fingerprint(directory)
+    if snapshot_fingerprint(directory) == fingerprint:
+        return set()
+    rows = read_appended(directory, fingerprint)
+    if rows is None:
+        return None
+    touched = apply(graph, *rows, caches=caches)
+    write_snapshot(graph, directory, fingerprint)
+    return touched
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import csv
+import os
+import random
+import sys
+
+SYLLABLES = [
+    "al", "an", "ar", "be", "ca", "da", "el", "en", "fa", "ga", "ha", "in",
+    "ja", "ka", "la", "li", "ma", "mi", "na", "no", "ol", "ra", "ri", "sa",
+    "se", "ta", "to", "va", "wi", "ya", "ze", "lo", "mo", "ro", "so", "th",
+]
+
+
+def main():
+    args = sys.argv[1:]
+    seed = 0
+    if "--seed" in args:
+        position = args.index("--seed")
+        try:
+            seed = int(args[position + 1])
+        except (IndexError, ValueError):
+            sys.exit("--seed needs a number")
+        del args[position:position + 2]
+    if len(args) not in (1, 2):
+        sys.exit("Usage: python generate.py directory [people] [--seed N]")
+    directory = args[0]
+    people = int(args[1]) if len(args) == 2 else 100000
+
+    counts = generate(directory, people, seed)
+    print(f"Wrote {counts[0]} people, {counts[1]} movies "
+          f"and {counts[2]} stars to {directory}")
+
+
+def generate(directory, people, seed=0, movies_per_person=0.4,
+             cast_exponent=2.6, popularity_exponent=0.75, max_cast=250):
+    """
+    Writes a synthetic people.csv, movies.csv and stars.csv to `directory`.
+
+    Cast sizes follow a power law with exponent `cast_exponent`, so most
+    movies have a handful of stars and a few have hundreds. Actors are
+    drawn with Zipf-like popularity weights, so a few appear in very
+    many movies while most appear in one or two.
+
+    Returns the number of people, movies and star rows written.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+    movie_count = max(1, int(people * movies_per_person))
+
+    first_names = [_word(rng, 2) for _ in range(max(10, int(people ** 0.5)))]
+    last_names = [_word(rng, rng.randint(2, 3)) for _ in range(max(10, int(people ** 0.6)))]
+    person_ids = [str(100 + i) for i in range(people)]
+    with open(os.path.join(directory, "people.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
+        f.write("id,name,birth\r\n")
+        for person_id in person_ids:
+            name = f"{rng.choice(first_names)} {rng.choice(last_names)}"
+            birth = rng.randint(1900, 2005) if rng.random() < 0.7 else ""
+            f.write(f"{person_id},")
+            writer.writerow([name, birth])
+
+    movie_ids = [str(1000000 + j) for j in range(movie_count)]
+    with open(os.path.join(directory, "movies.csv"), "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f, quoting=csv.QUOTE_NONNUMERIC)
+        f.write("id,title,year\r\n")
+        for movie_id in movie_ids:
+            title = " ".join(_word(rng, rng.randint(1, 3)) for _ in range(rng.randint(1, 4)))
+            f.write(f"{movie_id},")
+            writer.writerow([title, rng.randint(1920, 2024)])
+
+    # Cumulative Zipf weights over a shuffled order of people
+    popularity = person_ids[:]
+    rng.shuffle(popularity)
+    cumulative, total = [], 0.0
+    for rank in range(1, people + 1):
+        total += rank ** -popularity_exponent
+        cumulative.append(total)
+
+    star_count = 0
+    with open(os.path.join(directory, "stars.csv"), "w", encoding="utf-8", newline="") as f:
+        f.write("person_id,movie_id\r\n")
+        for movie_id in movie_ids:
+            cast = min(max_cast, people, int(2 * rng.paretovariate(cast_exponent - 1)))
+            stars = set(rng.choices(popularity, cum_weights=cumulative, k=cast))
+            for person_id in stars:
+                f.write(f"{person_id},{movie_id}\r\n")
+            star_count += len(stars)
+
+    return people, movie_count, star_count
+
+
+def _word(rng, syllables):
+    return "".join(rng.choice(SYLLABLES) for _ in range(syllables)).capitalize()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,793 @@
+import csv
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Mapping, Sequence
+
+from namesearch import NameSearch, normalize
+
+# Binary snapshot of a CostarGraph, written next to the CSV files
+SNAPSHOT = "degrees.snapshot"
+SNAPSHOT_MAGIC = b"DEGREES\0"
+SNAPSHOT_VERSION = 2
+CSV_FILES = ("people.csv", "movies.csv", "stars.csv")
+
+# magic, version, byte order marker, (size, mtime_ns) of each CSV file
+_HEADER = struct.Struct("=8sII6q")
+_BYTE_ORDER = 0x01020304
+_SECTION = struct.Struct("=qq")
+_INT_SECTIONS = (
+    "person_offsets", "person_movies", "movie_offsets", "movie_people",
+    "person_order", "movie_order", "name_order",
+)
+_STRING_SECTIONS = (
+    "person_ids", "person_names", "births", "movie_ids", "titles", "years",
+)
+
+
+class CostarGraph():
+    """
+    Compact co-star graph.
+
+    People and movies are numbered with dense integers, and the
+    person -> movie and movie -> person adjacency is kept as CSR arrays:
+    the movies of person `i` are
+    `person_movies[person_offsets[i]:person_offsets[i + 1]]`, and the
+    stars of movie `j` are `movie_people[movie_offsets[j]:movie_offsets[j + 1]]`.
+    """
+
+    def __init__(self, person_ids, person_names, births,
+                 movie_ids, titles, years,
+                 person_offsets, person_movies, movie_offsets, movie_people,
+                 person_index=None, movie_index=None, name_index=None):
+        self.person_ids = person_ids
+        self.person_names = person_names
+        self.births = births
+        self.movie_ids = movie_ids
+        self.titles = titles
+        self.years = years
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+
+        # Lookups from ids and normalized names to indices. Snapshots pass
+        # sorted-array indexes so that opening one does not touch every row
+        if person_index is None:
+            person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        if movie_index is None:
+            movie_index = {movie_id: j for j, movie_id in enumerate(movie_ids)}
+        if name_index is None:
+            name_index = {}
+            for i, name in enumerate(person_names):
+                name_index.setdefault(normalize(name), []).append(i)
+        self.person_index = person_index
+        self.movie_index = movie_index
+        self.name_index = name_index
+        self._name_search = None
+
+    @classmethod
+    def from_csv(cls, directory):
+        """
+        Build the graph straight from the CSV files, without going
+        through the `people` and `movies` dictionaries.
+        """
+        person_ids, person_names, births = [], [], []
+        person_index = {}
+        with open(f"{directory}/people.csv", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                if row["id"] in person_index:
+                    continue
+                person_index[row["id"]] = len(person_ids)
+                person_ids.append(row["id"])
+                person_names.append(row["name"])
+                births.append(row["birth"])
+
+        movie_ids, titles, years = [], [], []
+        movie_index = {}
+        with open(f"{directory}/movies.csv", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                if row["id"] in movie_index:
+                    continue
+                movie_index[row["id"]] = len(movie_ids)
+                movie_ids.append(row["id"])
+                titles.append(row["title"])
+                years.append(row["year"])
+
+        links = []
+        with open(f"{directory}/stars.csv", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                try:
+                    links.append((person_index[row["person_id"]],
+                                  movie_index[row["movie_id"]]))
+                except KeyError:
+                    pass
+
+        return cls(person_ids, person_names, births, movie_ids, titles, years,
+                   *build_csr(len(person_ids), len(movie_ids), links))
+
+    @classmethod
+    def from_data(cls, people, movies):
+        """
+        Build the graph from the dictionaries filled by `load_data`.
+        """
+        person_ids = list(people)
+        movie_ids = list(movies)
+        movie_index = {movie_id: j for j, movie_id in enumerate(movie_ids)}
+        links = [
+            (i, movie_index[movie_id])
+            for i, person_id in enumerate(person_ids)
+            for movie_id in people[person_id]["movies"]
+        ]
+        return cls(
+            person_ids,
+            [people[person_id]["name"] for person_id in person_ids],
+            [people[person_id]["birth"] for person_id in person_ids],
+            movie_ids,
+            [movies[movie_id]["title"] for movie_id in movie_ids],
+            [movies[movie_id]["year"] for movie_id in movie_ids],
+            *build_csr(len(person_ids), len(movie_ids), links)
+        )
+
+    def __len__(self):
+        return len(self.person_ids)
+
+    def apply_delta(self, people_rows=(), movie_rows=(), star_rows=()):
+        """
+        Adds rows shaped like those of people.csv, movies.csv and
+        stars.csv to the graph in place. Rows for ids already present
+        and links already known are ignored.
+
+        Returns the set of person indices whose co-stars changed.
+        """
+        for row in people_rows:
+            if row["id"] not in self.person_index:
+                self._add_person(row["id"], row["name"], row["birth"])
+        for row in movie_rows:
+            if row["id"] not in self.movie_index:
+                self._add_movie(row["id"], row["title"], row["year"])
+
+        old_people = len(self.person_offsets) - 1
+        person_additions, movie_additions = {}, {}
+        for row in star_rows:
+            person = self.person_index.get(row["person_id"])
+            movie = self.movie_index.get(row["movie_id"])
+            if person is None or movie is None:
+                continue
+            if person < old_people and movie in self.movies_of(person):
+                continue
+            if movie in person_additions.get(person, ()):
+                continue
+            person_additions.setdefault(person, []).append(movie)
+            movie_additions.setdefault(movie, []).append(person)
+
+        self.person_offsets, self.person_movies = _merge_csr(
+            self.person_offsets, self.person_movies, len(self.person_ids), person_additions)
+        self.movie_offsets, self.movie_people = _merge_csr(
+            self.movie_offsets, self.movie_people, len(self.movie_ids), movie_additions)
+        self._name_search = None
+
+        touched = set()
+        for movie in movie_additions:
+            touched.update(self.stars_of(movie))
+        return touched
+
+    def _add_person(self, person_id, name, birth):
+        i = len(self.person_ids)
+        for attribute, value in (("person_ids", person_id),
+                                 ("person_names", name), ("births", birth)):
+            _appendable(self, attribute).append(value)
+        _indexable(self, "person_index")[person_id] = i
+        name_index = _indexable(self, "name_index")
+        key = normalize(name)
+        name_index[key] = name_index.get(key, []) + [i]
+
+    def _add_movie(self, movie_id, title, year):
+        j = len(self.movie_ids)
+        for attribute, value in (("movie_ids", movie_id),
+                                 ("titles", title), ("years", year)):
+            _appendable(self, attribute).append(value)
+        _indexable(self, "movie_index")[movie_id] = j
+
+    def resolve(self, person, fuzzy=True):
+        """
+        Returns the person id for a person id or a name. A name shared by
+        several people is ambiguous and gives None. A name matching no
+        one gives the closest indexed name with `fuzzy`, otherwise None.
+        """
+        if person in self.person_index:
+            return person
+        indices = self.name_index.get(normalize(person), [])
+        if len(indices) == 1:
+            return self.person_ids[indices[0]]
+        if indices or not fuzzy:
+            return None
+        return self.name_search.resolve(person)
+
+    def ids_for_name(self, name):
+        """
+        Returns the sorted ids of everyone named exactly `name`, ignoring
+        case and extra whitespace.
+        """
+        return sorted(self.person_ids[i] for i in self.name_index.get(normalize(name), []))
+
+    @property
+    def name_search(self):
+        """
+        Prefix and fuzzy name index, ranked by film count. Snapshots reuse
+        their stored name order; otherwise it is sorted on first use.
+        """
+        if self._name_search is None:
+            if isinstance(self.name_index, _SortedIndex):
+                keys, order = self.name_index.keys_, self.name_index.order
+            else:
+                names = [normalize(name) for name in self.person_names]
+                order = sorted(range(len(names)), key=names.__getitem__)
+                keys = [names[i] for i in order]
+            self._name_search = NameSearch(
+                keys, order, self.person_ids,
+                lambda i: self.person_offsets[i + 1] - self.person_offsets[i]
+            )
+        return self._name_search
+
+    def movies_of(self, person):
+        """
+        Returns the movie indices a person index starred in.
+        """
+        return self.person_movies[self.person_offsets[person]:self.person_offsets[person + 1]]
+
+    def stars_of(self, movie):
+        """
+        Returns the person indices who starred in a movie index.
+        """
+        return self.movie_people[self.movie_offsets[movie]:self.movie_offsets[movie + 1]]
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for people
+        who starred with a given person index.
+        """
+        person_movies, movie_people = self.person_movies, self.movie_people
+        movie_offsets = self.movie_offsets
+        for k in range(self.person_offsets[person], self.person_offsets[person + 1]):
+            movie = person_movies[k]
+            for m in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                yield movie, movie_people[m]
+
+    def shortest_path(self, source, target, stats=None):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs
+        that connect the source to the target person ids.
+
+        If no possible path, returns None.
+        If `stats` is given, stats["expanded"] counts the nodes expanded.
+        """
+        return self.shortest_paths(source, [target], stats)[target]
+
+    def shortest_paths(self, source, targets, stats=None):
+        """
+        Answers many targets with one breadth-first search from `source`.
+
+        Returns a dictionary mapping each target person id to its shortest
+        list of (movie_id, person_id) pairs, or None if not connected.
+        The search stops as soon as every target has been reached.
+        """
+        source = self.person_index[source]
+        remaining = {self.person_index[target]: target for target in targets}
+        paths = dict.fromkeys(remaining.values())
+        if source in remaining:
+            paths[remaining.pop(source)] = []
+
+        n = len(self.person_ids)
+        parent = array("i", [-1]) * n
+        via = array("i", [-1]) * n
+        parent[source] = source
+        queue = array("i", [source])
+        person_offsets, person_movies = self.person_offsets, self.person_movies
+        movie_offsets, movie_people = self.movie_offsets, self.movie_people
+
+        head = 0
+        while remaining and head < len(queue):
+            person = queue[head]
+            head += 1
+            for k in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[k]
+                for m in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    neighbor = movie_people[m]
+                    if parent[neighbor] != -1:
+                        continue
+                    parent[neighbor] = person
+                    via[neighbor] = movie
+                    queue.append(neighbor)
+                    if neighbor in remaining:
+                        paths[remaining.pop(neighbor)] = self._path(parent, via, neighbor)
+
+        if stats is not None:
+            stats["expanded"] = stats.get("expanded", 0) + head
+        return paths
+
+    def distances(self, source):
+        """
+        Returns an array with the degrees of separation of every person
+        index from the person index `source`, or -1 where not connected.
+        """
+        distance = array("i", [-1]) * len(self.person_ids)
+        distance[source] = 0
+        queue = array("i", [source])
+        person_offsets, person_movies = self.person_offsets, self.person_movies
+        movie_offsets, movie_people = self.movie_offsets, self.movie_people
+
+        head = 0
+        while head < len(queue):
+            person = queue[head]
+            head += 1
+            next_distance = distance[person] + 1
+            for k in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[k]
+                for m in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    neighbor = movie_people[m]
+                    if distance[neighbor] == -1:
+                        distance[neighbor] = next_distance
+                        queue.append(neighbor)
+        return distance
+
+    def _path(self, parent, via, person):
+        """
+        Walks parent pointers back to the search root and returns
+        the (movie_id, person_id) pairs leading to `person`.
+        """
+        path = []
+        while parent[person] != person:
+            path.append((self.movie_ids[via[person]], self.person_ids[person]))
+            person = parent[person]
+        path.reverse()
+        return path
+
+    @property
+    def people(self):
+        """
+        Read-only view shaped like the `people` dictionary of degrees.py.
+        """
+        return _PeopleView(self)
+
+    @property
+    def movies(self):
+        """
+        Read-only view shaped like the `movies` dictionary of degrees.py.
+        """
+        return _MoviesView(self)
+
+    @property
+    def names(self):
+        """
+        Read-only view shaped like the `names` dictionary of degrees.py.
+        """
+        return _NamesView(self)
+
+
+def load_graph(directory):
+    """
+    Returns the graph for a data directory, opening its snapshot if it
+    is up to date and otherwise parsing the CSV files and writing one.
+    """
+    graph = load_snapshot(directory)
+    if graph is None:
+        fingerprint = csv_fingerprint(directory)
+        graph = CostarGraph.from_csv(directory)
+        try:
+            write_snapshot(graph, directory, fingerprint)
+        except OSError:
+            pass
+    return graph
+
+
+def csv_fingerprint(directory):
+    """
+    Returns the (size, mtime_ns) of every CSV file, flattened,
+    or None if any of them is missing.
+    """
+    fingerprint = []
+    for filename in CSV_FILES:
+        try:
+            stat = os.stat(os.path.join(directory, filename))
+        except OSError:
+            return None
+        fingerprint += [stat.st_size, stat.st_mtime_ns]
+    return tuple(fingerprint)
+
+
+def snapshot_is_fresh(directory):
+    """
+    Returns True if the directory has a snapshot matching its CSV files.
+    """
+    try:
+        with open(os.path.join(directory, SNAPSHOT), "rb") as f:
+            header = f.read(_HEADER.size)
+    except OSError:
+        return False
+    return _header_matches(header, directory)
+
+
+def snapshot_fingerprint(directory):
+    """
+    Returns the CSV fingerprint stamped in the directory's snapshot,
+    whether or not it still matches, or None if there is no snapshot.
+    """
+    try:
+        with open(os.path.join(directory, SNAPSHOT), "rb") as f:
+            header = f.read(_HEADER.size)
+    except OSError:
+        return None
+    if len(header) < _HEADER.size:
+        return None
+    magic, version, byte_order, *fingerprint = _HEADER.unpack_from(header)
+    if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION or byte_order != _BYTE_ORDER:
+        return None
+    return tuple(fingerprint)
+
+
+def _header_matches(header, directory):
+    if len(header) < _HEADER.size:
+        return False
+    magic, version, byte_order, *fingerprint = _HEADER.unpack_from(header)
+    return (
+        magic == SNAPSHOT_MAGIC
+        and version == SNAPSHOT_VERSION
+        and byte_order == _BYTE_ORDER
+        and tuple(fingerprint) == csv_fingerprint(directory)
+    )
+
+
+def write_snapshot(graph, directory, fingerprint):
+    """
+    Writes the graph to a versioned binary snapshot in `directory`,
+    stamped with `fingerprint`, the csv_fingerprint taken before the
+    graph's rows were read. Rows appended while reading then count as
+    new on the next refresh instead of being skipped.
+    """
+    if fingerprint is None:
+        raise OSError(f"missing CSV files in {directory}")
+
+    sections = [
+        graph.person_offsets, graph.person_movies,
+        graph.movie_offsets, graph.movie_people,
+        array("i", sorted(range(len(graph.person_ids)), key=graph.person_ids.__getitem__)),
+        array("i", sorted(range(len(graph.movie_ids)), key=graph.movie_ids.__getitem__)),
+        array("i", sorted(range(len(graph.person_names)),
+                          key=lambda i: normalize(graph.person_names[i]))),
+    ]
+    for name in _STRING_SECTIONS:
+        offsets, blob = _pack_strings(getattr(graph, name))
+        sections += [offsets, blob]
+
+    path = os.path.join(directory, SNAPSHOT)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, _BYTE_ORDER, *fingerprint))
+        table_start = f.tell()
+        f.write(bytes(_SECTION.size * len(sections)))
+        table = []
+        for section in sections:
+            f.write(bytes(-f.tell() % 8))
+            start = f.tell()
+            f.write(section)
+            table.append(_SECTION.pack(start, f.tell() - start))
+        f.seek(table_start)
+        f.write(b"".join(table))
+    os.replace(temporary, path)
+
+
+def load_snapshot(directory, check=True):
+    """
+    Memory-maps the snapshot in `directory` and returns its graph,
+    or None if there is no snapshot, it cannot be parsed, or it no
+    longer matches the CSVs.
+    With `check=False` a snapshot older than the CSVs is opened too.
+    """
+    if not check and snapshot_fingerprint(directory) is None:
+        return None
+    try:
+        with open(os.path.join(directory, SNAPSHOT), "rb") as f:
+            if check and not _header_matches(f.read(_HEADER.size), directory):
+                return None
+            snapshot = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    # A truncated or corrupt body means the CSVs have to be read again
+    view = memoryview(snapshot)
+    count = len(_INT_SECTIONS) + 2 * len(_STRING_SECTIONS)
+    if _HEADER.size + count * _SECTION.size > len(snapshot):
+        return None
+    sections = []
+    for k in range(count):
+        start, length = _SECTION.unpack_from(snapshot, _HEADER.size + k * _SECTION.size)
+        if start < 0 or length < 0 or start + length > len(snapshot):
+            return None
+        sections.append(view[start:start + length])
+
+    try:
+        ints = dict(zip(_INT_SECTIONS, (section.cast("i") for section in sections)))
+        strings = {
+            name: _StringTable(sections[len(_INT_SECTIONS) + 2 * k].cast("q"),
+                               sections[len(_INT_SECTIONS) + 2 * k + 1])
+            for k, name in enumerate(_STRING_SECTIONS)
+        }
+    except TypeError:
+        return None
+    graph = CostarGraph(
+        strings["person_ids"], strings["person_names"], strings["births"],
+        strings["movie_ids"], strings["titles"], strings["years"],
+        ints["person_offsets"], ints["person_movies"],
+        ints["movie_offsets"], ints["movie_people"],
+        person_index=_SortedIndex(strings["person_ids"], ints["person_order"]),
+        movie_index=_SortedIndex(strings["movie_ids"], ints["movie_order"]),
+        name_index=_SortedIndex(strings["person_names"], ints["name_order"],
+                                key=normalize, unique=False)
+    )
+    graph.snapshot = snapshot
+    return graph
+
+
+def _pack_strings(strings):
+    """
+    Encodes strings as an offsets array and one UTF-8 blob.
+    """
+    offsets = array("q", [0])
+    blob = bytearray()
+    for string in strings:
+        blob += string.encode("utf-8")
+        offsets.append(len(blob))
+    return offsets, blob
+
+
+class _StringTable(Sequence):
+    """
+    Sequence of strings decoded on demand from a snapshot section.
+    """
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], "utf-8")
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+
+class _SortedKeys(Sequence):
+    def __init__(self, strings, order, key):
+        self.strings = strings
+        self.order = order
+        self.key = key
+
+    def __getitem__(self, position):
+        return self.key(self.strings[self.order[position]])
+
+    def __len__(self):
+        return len(self.order)
+
+
+class _SortedIndex(Mapping):
+    """
+    Maps strings to their indices by binary search over an array of
+    indices sorted by key. With `unique=False` values are lists of
+    indices, like the name index of CostarGraph.
+    """
+
+    def __init__(self, strings, order, key=str, unique=True):
+        self.keys_ = _SortedKeys(strings, order, key)
+        self.order = order
+        self.unique = unique
+
+    def __getitem__(self, key):
+        low = bisect_left(self.keys_, key)
+        if low == len(self.keys_) or self.keys_[low] != key:
+            raise KeyError(key)
+        if self.unique:
+            return self.order[low]
+        high = bisect_right(self.keys_, key, low)
+        return list(self.order[low:high])
+
+    def __iter__(self):
+        previous = None
+        for key in self.keys_:
+            if key != previous:
+                yield key
+            previous = key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+def _merge_csr(offsets, indices, count, additions):
+    """
+    Returns CSR arrays for `count` nodes with the index lists in
+    `additions` (node -> list) appended to each node's existing list.
+    Nodes past the end of the old offsets start out empty.
+    """
+    old_count = len(offsets) - 1
+    view = memoryview(indices)
+    merged = array("i")
+    merged_offsets = array("i", [0]) * (count + 1)
+    shift = copied = 0
+    for node in range(count):
+        end = offsets[node + 1] if node < old_count else offsets[old_count]
+        extra = additions.get(node)
+        if extra:
+            merged.frombytes(view[copied:end].tobytes())
+            merged.extend(extra)
+            copied = end
+            shift += len(extra)
+        merged_offsets[node + 1] = end + shift
+    merged.frombytes(view[copied:].tobytes())
+    return merged_offsets, merged
+
+
+def _appendable(graph, attribute):
+    """
+    Returns the sequence stored at `attribute`, first wrapping it so
+    that it can be appended to if it is read-only snapshot data.
+    """
+    sequence = getattr(graph, attribute)
+    if not isinstance(sequence, (list, _Extended)):
+        sequence = _Extended(sequence)
+        setattr(graph, attribute, sequence)
+    return sequence
+
+
+def _indexable(graph, attribute):
+    """
+    Returns the index stored at `attribute`, first wrapping it so that
+    entries can be added if it is a read-only sorted index.
+    """
+    index = getattr(graph, attribute)
+    if not isinstance(index, (dict, _OverlayIndex)):
+        index = _OverlayIndex(index)
+        setattr(graph, attribute, index)
+    return index
+
+
+class _Extended(Sequence):
+    """
+    Read-only sequence followed by a list of appended items.
+    """
+
+    def __init__(self, base):
+        self.base = base
+        self.extra = []
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if i < len(self.base):
+            return self.base[i]
+        return self.extra[i - len(self.base)]
+
+    def __len__(self):
+        return len(self.base) + len(self.extra)
+
+    def append(self, item):
+        self.extra.append(item)
+
+
+class _OverlayIndex(Mapping):
+    """
+    Read-only index with a dictionary of added or replaced entries on top.
+    """
+
+    def __init__(self, base):
+        self.base = base
+        self.extra = {}
+
+    def __getitem__(self, key):
+        if key in self.extra:
+            return self.extra[key]
+        return self.base[key]
+
+    def __setitem__(self, key, value):
+        self.extra[key] = value
+
+    def __iter__(self):
+        yield from self.extra
+        for key in self.base:
+            if key not in self.extra:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+def build_csr(person_count, movie_count, links):
+    """
+    Turns (person, movie) index pairs into CSR offset and index arrays
+    for both directions. Duplicate pairs are dropped.
+    """
+    keys = sorted({person * movie_count + movie for person, movie in links})
+
+    person_offsets = array("i", [0]) * (person_count + 1)
+    person_movies = array("i", [0]) * len(keys)
+    movie_offsets = array("i", [0]) * (movie_count + 1)
+    for k, key in enumerate(keys):
+        person, movie = divmod(key, movie_count)
+        person_offsets[person + 1] += 1
+        person_movies[k] = movie
+        movie_offsets[movie + 1] += 1
+    for i in range(person_count):
+        person_offsets[i + 1] += person_offsets[i]
+    for j in range(movie_count):
+        movie_offsets[j + 1] += movie_offsets[j]
+
+    # Counting sort by movie; keys are already ordered by person
+    movie_people = array("i", [0]) * len(keys)
+    fill = array("i", movie_offsets)
+    for key in keys:
+        person, movie = divmod(key, movie_count)
+        movie_people[fill[movie]] = person
+        fill[movie] += 1
+
+    return person_offsets, person_movies, movie_offsets, movie_people
+
+
+class _PeopleView(Mapping):
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, person_id):
+        graph = self.graph
+        i = graph.person_index[person_id]
+        return {
+            "name": graph.person_names[i],
+            "birth": graph.births[i],
+            "movies": {graph.movie_ids[j] for j in graph.movies_of(i)}
+        }
+
+    def __iter__(self):
+        return iter(self.graph.person_ids)
+
+    def __len__(self):
+        return len(self.graph.person_ids)
+
+
+class _MoviesView(Mapping):
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, movie_id):
+        graph = self.graph
+        j = graph.movie_index[movie_id]
+        return {
+            "title": graph.titles[j],
+            "year": graph.years[j],
+            "stars": {graph.person_ids[i] for i in graph.stars_of(j)}
+        }
+
+    def __iter__(self):
+        return iter(self.graph.movie_ids)
+
+    def __len__(self):
+        return len(self.graph.movie_ids)
+
+
+class _NamesView(Mapping):
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, name):
+        graph = self.graph
+        return {graph.person_ids[i] for i in graph.name_index[name]}
+
+    def __iter__(self):
+        return iter(self.graph.name_index)
+
+    def __len__(self):
+        return len(self.graph.name_index)
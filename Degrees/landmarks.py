@@ -0,0 +1,252 @@
+import math
+import os
+import struct
+import sys
+from array import array
+
+from graph import csv_fingerprint, load_graph
+from util import Node, PriorityFrontier
+
+# Landmark distances, written next to the CSV files
+LANDMARKS = "degrees.landmarks"
+LANDMARKS_MAGIC = b"LANDMARK"
+LANDMARKS_VERSION = 1
+
+# magic, version, landmark count, person count, (size, mtime_ns) of each CSV
+_HEADER = struct.Struct("=8sIIq6q")
+
+
+def main():
+    if len(sys.argv) > 3:
+        sys.exit("Usage: python landmarks.py [directory] [k]")
+    directory = sys.argv[1] if len(sys.argv) >= 2 else "large"
+    k = int(sys.argv[2]) if len(sys.argv) == 3 else 16
+
+    graph = load_graph(directory)
+    oracle = LandmarkOracle.build(graph, k)
+    oracle.save(directory)
+    print(f"Wrote {len(oracle.landmarks)} landmarks to {os.path.join(directory, LANDMARKS)}")
+    for landmark in oracle.landmarks:
+        print(f"  {graph.person_ids[landmark]}: {graph.person_names[landmark]}")
+
+
+class LandmarkOracle():
+    """
+    Degree-of-separation estimates from precomputed landmark distances.
+
+    For every landmark L the breadth-first distance d(L, p) to every
+    person p is stored, and by the triangle inequality
+
+        |d(L, s) - d(L, t)| <= d(s, t) <= d(L, s) + d(L, t)
+
+    so bounds for any pair take O(K) lookups.
+    """
+
+    def __init__(self, graph, landmarks, distances):
+        self.graph = graph
+        self.landmarks = landmarks
+        self.distances = distances
+
+    @classmethod
+    def build(cls, graph, k):
+        """
+        Picks up to `k` landmarks and runs one breadth-first search from
+        each.
+
+        Landmarks go to the largest connected component first. There the
+        first is the person with the most films, and each following one
+        is the person farthest from the landmarks so far, which spreads
+        them over the edges of the component where they give the
+        tightest lower bounds. Only once every person of a component is
+        a landmark do the rest go to the next largest one. People with no
+        co-stars are never picked: a landmark among them bounds nothing.
+        """
+        n = len(graph)
+        landmarks, distances = [], []
+        closest = array("i", [-1]) * n
+        for members in components(graph):
+            if len(landmarks) == k:
+                break
+            candidate = max(members, key=lambda i: graph.person_offsets[i + 1] - graph.person_offsets[i])
+            while len(landmarks) < k:
+                landmarks.append(candidate)
+                distance = graph.distances(candidate)
+                distances.append(distance)
+
+                # Track each member's distance to the nearest landmark
+                for i in members:
+                    if closest[i] == -1 or distance[i] < closest[i]:
+                        closest[i] = distance[i]
+
+                candidate = max(members, key=closest.__getitem__)
+                if closest[candidate] == 0:
+                    break
+        return cls(graph, landmarks, distances)
+
+    def save(self, directory):
+        """
+        Writes the landmark distances next to the CSV files in `directory`.
+        """
+        fingerprint = csv_fingerprint(directory)
+        if fingerprint is None:
+            raise OSError(f"missing CSV files in {directory}")
+        path = os.path.join(directory, LANDMARKS)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            f.write(_HEADER.pack(LANDMARKS_MAGIC, LANDMARKS_VERSION,
+                                 len(self.landmarks), len(self.graph), *fingerprint))
+            f.write(array("i", self.landmarks))
+            for distance in self.distances:
+                f.write(distance)
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, graph, directory):
+        """
+        Returns the oracle saved in `directory` for `graph`, or None if
+        there is none or the CSV files have changed since it was built.
+        """
+        try:
+            with open(os.path.join(directory, LANDMARKS), "rb") as f:
+                header = f.read(_HEADER.size)
+                if len(header) < _HEADER.size:
+                    return None
+                magic, version, k, n, *fingerprint = _HEADER.unpack(header)
+                if (magic != LANDMARKS_MAGIC or version != LANDMARKS_VERSION
+                        or n != len(graph) or tuple(fingerprint) != csv_fingerprint(directory)):
+                    return None
+                landmarks = array("i")
+                landmarks.fromfile(f, k)
+                distances = []
+                for _ in range(k):
+                    distance = array("i")
+                    distance.fromfile(f, n)
+                    distances.append(distance)
+        except (OSError, EOFError):
+            return None
+        return cls(graph, list(landmarks), distances)
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the degrees of separation between
+        two person ids. Both are math.inf if the landmarks prove the pair
+        is not connected, and upper is math.inf if no landmark reaches them.
+        """
+        s, t = self.graph.person_index[source], self.graph.person_index[target]
+        if s == t:
+            return 0, 0
+        lower, upper = 1, math.inf
+        for distance in self.distances:
+            ds, dt = distance[s], distance[t]
+            if ds == -1 and dt == -1:
+                continue
+            if ds == -1 or dt == -1:
+                return math.inf, math.inf
+            lower = max(lower, abs(ds - dt))
+            upper = min(upper, ds + dt)
+        return lower, upper
+
+    def heuristic(self, target):
+        """
+        Returns a function estimating the remaining degrees from a person
+        index to the person index `target`. It never overestimates, and
+        returns math.inf for people the landmarks prove cannot reach it.
+        """
+        to_target = [(distance, distance[target]) for distance in self.distances]
+
+        def estimate(person):
+            best = 0
+            for distance, dt in to_target:
+                dp = distance[person]
+                if dp == -1 and dt == -1:
+                    continue
+                if dp == -1 or dt == -1:
+                    return math.inf
+                if abs(dp - dt) > best:
+                    best = abs(dp - dt)
+            return best
+
+        return estimate
+
+    def shortest_path(self, source, target, stats=None):
+        """
+        Returns the shortest list of (movie_id, person_id) pairs that
+        connect the source to the target person ids, found by A* search
+        with the landmark lower bound as heuristic (ALT).
+
+        If no possible path, returns None.
+        If `stats` is given, stats["expanded"] counts the nodes expanded.
+        """
+        graph = self.graph
+        s, t = graph.person_index[source], graph.person_index[target]
+        estimate = self.heuristic(t)
+        if estimate(s) == math.inf:
+            return None
+
+        frontier = PriorityFrontier()
+        frontier.add(Node(state=s, parent=None, action=None), (estimate(s), 0))
+        cost = {s: 0}
+        explored = set()
+        while not frontier.empty():
+            node = frontier.remove()
+            if node.state in explored:
+                continue
+            explored.add(node.state)
+            if stats is not None:
+                stats["expanded"] = stats.get("expanded", 0) + 1
+
+            if node.state == t:
+                path = []
+                while node.parent is not None:
+                    path.append((graph.movie_ids[node.action], graph.person_ids[node.state]))
+                    node = node.parent
+                path.reverse()
+                return path
+
+            g = cost[node.state] + 1
+            for movie, person in graph.neighbors(node.state):
+                if person in explored or cost.get(person, math.inf) <= g:
+                    continue
+                h = estimate(person)
+                if h == math.inf:
+                    continue
+                cost[person] = g
+                # Prefer deeper nodes among equal estimates
+                frontier.add(Node(state=person, parent=node, action=movie), (g + h, -g))
+        return None
+
+
+def components(graph):
+    """
+    Returns the connected components of people with at least one
+    co-star, as lists of person indices, largest first.
+    """
+    person_offsets, person_movies = graph.person_offsets, graph.person_movies
+    movie_offsets, movie_people = graph.movie_offsets, graph.movie_people
+    seen = bytearray(len(graph))
+    seen_movies = bytearray(len(movie_offsets) - 1)
+    found = []
+    for start in range(len(graph)):
+        if seen[start]:
+            continue
+        seen[start] = 1
+        members = [start]
+        for person in members:
+            for k in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[k]
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+                for m in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                    neighbor = movie_people[m]
+                    if not seen[neighbor]:
+                        seen[neighbor] = 1
+                        members.append(neighbor)
+        if len(members) > 1:
+            found.append(members)
+    found.sort(key=len, reverse=True)
+    return found
+
+
+if __name__ == "__main__":
+    main()
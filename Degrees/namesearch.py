@@ -0,0 +1,266 @@
+from bisect import bisect_left, bisect_right
+from collections import Counter
+
+# Sorts after any character found in a name, to bound prefix ranges
+_PREFIX_END = "\U0010ffff"
+# Pieces of a key, beyond one per allowed edit, that a fuzzy match must
+# share with the query before it is compared in full
+SHARED_PIECES = 2
+
+
+class NameSearch():
+    """
+    Sorted-array index over lowercase person names.
+
+    `keys` is the sorted sequence of normalized names and `order[p]` the
+    row of the person at sorted position p. Rows index `person_ids`, and
+    `film_count(row)` gives the number of films used to rank results.
+
+    Fuzzy search first looks up every string one edit away from the
+    query, which finds all matches within one edit. Only if those are
+    fewer than asked for does it cut every key into max_distance +
+    SHARED_PIECES pieces. Edits can change at most max_distance of them, so a name
+    within that many edits keeps SHARED_PIECES pieces unchanged, close to
+    their place in the key; only keys sharing that many pieces with the
+    query are compared with it in full.
+    """
+
+    def __init__(self, keys, order, person_ids, film_count):
+        self.keys = keys
+        self.order = order
+        self.person_ids = person_ids
+        self.film_count = film_count
+        # Positions of each key and the characters used, built on first use
+        self._positions = None
+        self._alphabet = None
+        # (keys, piece index) by max_distance, built on first use
+        self._pieces = {}
+
+    @classmethod
+    def from_people(cls, people):
+        """
+        Builds the index from the `people` dictionary of degrees.py.
+        """
+        person_ids = list(people)
+        names = [normalize(people[person_id]["name"]) for person_id in person_ids]
+        order = sorted(range(len(person_ids)), key=names.__getitem__)
+        keys = [names[row] for row in order]
+        return cls(keys, order, person_ids,
+                   lambda row: len(people[person_ids[row]]["movies"]))
+
+    def add(self, name, person_id):
+        """
+        Inserts a new person into an index built by `from_people`.
+        """
+        key = normalize(name)
+        position = bisect_right(self.keys, key)
+        self.keys.insert(position, key)
+        self.order.insert(position, len(self.person_ids))
+        self.person_ids.append(person_id)
+        # Fuzzy indexes use sorted positions, which have just shifted
+        self._positions = None
+        self._pieces.clear()
+
+    def exact(self, name):
+        """
+        Returns the person ids with exactly this name, ignoring case and
+        extra whitespace, most films first.
+        """
+        key = normalize(name)
+        low = bisect_left(self.keys, key)
+        high = bisect_right(self.keys, key, low)
+        return self._ranked(range(low, high))
+
+    def prefix(self, prefix, limit=10):
+        """
+        Returns up to `limit` person ids whose names start with `prefix`,
+        most films first.
+        """
+        key = normalize(prefix)
+        low = bisect_left(self.keys, key)
+        high = bisect_left(self.keys, key + _PREFIX_END, low)
+        return self._ranked(range(low, high))[:limit]
+
+    def fuzzy(self, name, max_distance=2, limit=10):
+        """
+        Returns up to `limit` (person_id, distance) pairs for names within
+        `max_distance` edits of `name`, closest first, then most films.
+        """
+        query = normalize(name)
+        if max_distance >= 1:
+            # Every match within one edit ranks before any further away
+            matches = self._neighbours(query)
+            if max_distance == 1 or len(matches) >= limit:
+                return self._closest(matches, limit)
+
+        keys, pieces = self._piece_index(max_distance)
+        candidates = []
+        for length in range(max(0, len(query) - max_distance),
+                            len(query) + max_distance + 1):
+            if (length, 0) not in pieces:
+                continue
+            # An unchanged piece moves by the insertions less deletions
+            # before it, and those edits and the ones after it, which
+            # make up the rest of the length difference, are within
+            # max_distance
+            difference = len(query) - length
+            shifts = [shift for shift in range(-max_distance, max_distance + 1)
+                      if abs(shift) + abs(difference - shift) <= max_distance]
+            shared = Counter()
+            for i, (start, size) in enumerate(_cut(length, max_distance + SHARED_PIECES)):
+                index = pieces[length, i]
+                found = set()
+                for shift in shifts:
+                    if 0 <= start + shift <= len(query) - size:
+                        found.update(index.get(query[start + shift:start + shift + size], ()))
+                shared.update(found)
+            candidates.extend(position for position, count in shared.items()
+                              if count >= SHARED_PIECES)
+
+        masks = {}
+        for j, character in enumerate(query):
+            masks[character] = masks.get(character, 0) | 1 << j
+        matches = []
+        for position in candidates:
+            distance = _distance(query, masks, keys[position], max_distance)
+            if distance is not None:
+                matches.append((distance, position))
+        return self._closest(matches, limit)
+
+    def _closest(self, matches, limit):
+        """
+        Returns the person ids and distances of the `limit` best
+        (distance, position) matches, closest first, then most films.
+        """
+        ranked = sorted(
+            matches,
+            key=lambda match: (match[0], -self.film_count(self.order[match[1]]))
+        )
+        return [(self.person_ids[self.order[position]], distance)
+                for distance, position in ranked[:limit]]
+
+    def resolve(self, name, max_distance=2):
+        """
+        Returns the best person id for a possibly misspelled name: an
+        exact match with the most films, otherwise the closest fuzzy
+        match. Returns None if nothing is within `max_distance` edits.
+        """
+        person_ids = self.exact(name)
+        if person_ids:
+            return person_ids[0]
+        matches = self.fuzzy(name, max_distance, limit=1)
+        return matches[0][0] if matches else None
+
+    def _neighbours(self, query):
+        """
+        Returns the (distance, position) of every key equal to `query` or
+        one deletion, substitution or insertion away from it.
+        """
+        if self._positions is None:
+            self._positions = {}
+            for position, key in enumerate(self.keys):
+                self._positions.setdefault(key, []).append(position)
+            self._alphabet = sorted(set("".join(self._positions)))
+        variants = {query: 0}
+        for i in range(len(query) + 1):
+            if i < len(query):
+                variants.setdefault(query[:i] + query[i + 1:], 1)
+            for character in self._alphabet:
+                variants.setdefault(query[:i] + character + query[i:], 1)
+                if i < len(query):
+                    variants.setdefault(query[:i] + character + query[i + 1:], 1)
+        matches = []
+        for variant, distance in variants.items():
+            for position in self._positions.get(variant, ()):
+                matches.append((distance, position))
+        return matches
+
+    def _piece_index(self, max_distance):
+        """
+        Returns the keys as a list and a dictionary mapping (key length,
+        piece number) to a dictionary from each piece to the positions of
+        the keys of that length with that piece.
+        """
+        if max_distance not in self._pieces:
+            keys = list(self.keys)
+            pieces = {}
+            cuts = {}
+            for position, key in enumerate(keys):
+                length = len(key)
+                if length not in cuts:
+                    cuts[length] = _cut(length, max_distance + SHARED_PIECES)
+                    for i in range(len(cuts[length])):
+                        pieces[length, i] = {}
+                for i, (start, size) in enumerate(cuts[length]):
+                    pieces[length, i].setdefault(key[start:start + size], []).append(position)
+            self._pieces[max_distance] = keys, pieces
+        return self._pieces[max_distance]
+
+    def _ranked(self, positions):
+        if len(positions) == 1:
+            return [self.person_ids[self.order[positions[0]]]]
+        rows = sorted((self.order[position] for position in positions),
+                      key=lambda row: -self.film_count(row))
+        return [self.person_ids[row] for row in rows]
+
+
+def normalize(name):
+    """
+    Lowercases a name and collapses runs of whitespace.
+    """
+    return " ".join(name.split()).lower()
+
+
+def _cut(length, count):
+    """
+    Returns the (start, size) of `count` pieces covering a string of
+    `length` characters, the shorter pieces first.
+    """
+    short, extra = divmod(length, count)
+    pieces = []
+    start = 0
+    for i in range(count):
+        size = short + (i >= count - extra)
+        pieces.append((start, size))
+        start += size
+    return pieces
+
+
+def _distance(query, masks, key, max_distance):
+    """
+    Returns the edit distance between `query` and `key`, or None if it
+    is more than `max_distance`. `masks` maps each character of `query`
+    to the bit mask of its positions.
+
+    The Levenshtein column over `query` is kept as two bit vectors of
+    +1 and -1 steps (Myers, 1999), so each key character costs a few
+    integer operations instead of a row of len(query) minimums.
+    """
+    if abs(len(query) - len(key)) > max_distance:
+        return None
+    if not query:
+        return len(key)
+    full = (1 << len(query)) - 1
+    last = 1 << (len(query) - 1)
+    up, down = full, 0
+    score = len(query)
+    remaining = len(key)
+    for character in key:
+        match = masks.get(character, 0)
+        vertical = match | down
+        horizontal = (((match & up) + up) ^ up) | match
+        right = down | (~(horizontal | up) & full)
+        left = up & horizontal
+        if right & last:
+            score += 1
+        elif left & last:
+            score -= 1
+        remaining -= 1
+        if score - remaining > max_distance:
+            return None
+        # The first row is 0, 1, 2, ..., so a +1 step enters at the top
+        right = right << 1 | 1
+        left <<= 1
+        up = (left | ~(vertical | right)) & full
+        down = right & vertical
+    return score if score <= max_distance else None
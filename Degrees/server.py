@@ -0,0 +1,256 @@
+import asyncio
+import concurrent.futures
+import json
+import sys
+import time
+from collections import deque
+from concurrent.futures.process import BrokenProcessPool
+
+import delta
+from cache import BFSTreeCache
+from graph import csv_fingerprint, load_graph, load_snapshot, snapshot_fingerprint
+from util import pool_context, workers_option
+
+HOST = "127.0.0.1"
+PORT = 8765
+# Latencies kept per operation for the percentile counters
+LATENCY_WINDOW = 10000
+# Operations with their own counters; anything else counts as "invalid"
+OPS = ("resolve", "path", "degrees", "refresh", "stats")
+
+# Graph loaded once, before the worker pool starts, so forked workers
+# share it. Each worker keeps its own cache of search trees.
+graph = None
+tree_cache = None
+
+
+def main():
+    args = sys.argv[1:]
+    workers = workers_option(args)
+    if len(args) > 2:
+        sys.exit("Usage: python server.py [directory] [port] [--workers N]")
+    directory = args[0] if len(args) >= 1 else "large"
+    port = int(args[1]) if len(args) == 2 else PORT
+
+    global graph
+    print("Loading data...")
+    graph = load_graph(directory)
+    print("Data loaded.")
+    asyncio.run(serve(directory, HOST, port, workers))
+
+
+async def serve(directory, host, port, workers=None):
+    """
+    Answers JSON-lines requests on a TCP socket until cancelled.
+    """
+    server = DegreesServer(directory, workers)
+    listener = await asyncio.start_server(server.handle, host, port)
+    print(f"Listening on {host}:{port}")
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.pool.shutdown()
+
+
+class DegreesServer():
+    """
+    Handles one JSON request per line:
+
+        {"op": "resolve", "name": "Kevin Bacon"}
+        {"op": "path", "source": "102", "target": "Tom Hanks"}
+        {"op": "degrees", "source": "102", "target": "158"}
+        {"op": "refresh"}
+        {"op": "stats"}
+
+    `source` and `target` may be person ids or names. A name shared by
+    several people is an error listing their ids, and a name matching
+    no one resolves to the closest indexed name. Id and exact name
+    lookups run on the event loop; fuzzy matching and searches run in
+    the worker pool.
+    `refresh` applies rows appended to the CSV files since the snapshot
+    was written to a separate copy of the graph, in a thread, and swaps
+    it in once its name index is built. The workers are then restarted
+    on the updated graph.
+    """
+
+    def __init__(self, directory, workers=None):
+        self.directory = directory
+        self.workers = workers
+        self.pool = self.start_pool()
+        self.refresh_lock = asyncio.Lock()
+        self.latencies = {}
+        self.counts = {}
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                start = time.perf_counter()
+                op = "invalid"
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    request = None
+                if not isinstance(request, dict):
+                    response = {"error": "invalid request"}
+                else:
+                    if request.get("op") in OPS:
+                        op = request["op"]
+                    pool = self.pool
+                    try:
+                        response = await self.dispatch(str(request.get("op")), request)
+                    except Exception as error:
+                        # A failed request must not close the connection
+                        if isinstance(error, BrokenProcessPool):
+                            self.replace_pool(pool)
+                        response = {"error": f"{type(error).__name__}: {error}"}
+                self.record(op, time.perf_counter() - start)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def dispatch(self, op, request):
+        if op == "stats":
+            return self.stats()
+        if op == "refresh":
+            return await self.refresh()
+        if op == "resolve":
+            return {"ids": graph.ids_for_name(str(request.get("name", "")))}
+        if op in ("path", "degrees"):
+            source, error = await self.resolve(str(request.get("source", "")))
+            if error is not None:
+                return error
+            target, error = await self.resolve(str(request.get("target", "")))
+            if error is not None:
+                return error
+            loop = asyncio.get_running_loop()
+            path = await loop.run_in_executor(self.pool, _shortest_path, source, target)
+            degrees = None if path is None else len(path)
+            if op == "degrees":
+                return {"degrees": degrees}
+            return {"degrees": degrees, "path": path}
+        return {"error": f"unknown op: {op}"}
+
+    async def resolve(self, name):
+        """
+        Returns (person id, None) for a person id or name, or (None, an
+        error response) if it is ambiguous or matches no one.
+        """
+        person = graph.resolve(name, fuzzy=False)
+        if person is not None:
+            return person, None
+        person_ids = graph.ids_for_name(name)
+        if person_ids:
+            return None, {"error": f"ambiguous name: {name}", "ids": person_ids}
+        loop = asyncio.get_running_loop()
+        person = await loop.run_in_executor(self.pool, _resolve, name)
+        if person is None:
+            return None, {"error": "person not found"}
+        return person, None
+
+    def start_pool(self):
+        return concurrent.futures.ProcessPoolExecutor(
+            self.workers, mp_context=pool_context(),
+            initializer=_init_worker, initargs=(self.directory,)
+        )
+
+    def replace_pool(self, old_pool):
+        """
+        Starts a new worker pool in place of `old_pool` and shuts that
+        down, unless it has already been replaced.
+        """
+        if self.pool is old_pool:
+            self.pool = self.start_pool()
+            old_pool.shutdown(wait=False)
+
+    async def refresh(self):
+        global graph
+        # Requests keep reading the old graph until the new one is ready
+        async with self.refresh_lock:
+            updated, touched = await asyncio.to_thread(_refreshed_graph, self.directory)
+            if touched is None:
+                return {"error": "CSV files were rewritten; restart the server"}
+            if updated is not None:
+                graph = updated
+                # Workers hold a copy of the old graph and caches built on it
+                self.replace_pool(self.pool)
+            return {"people_affected": len(touched)}
+
+    def record(self, op, seconds):
+        if op not in self.latencies:
+            self.latencies[op] = deque(maxlen=LATENCY_WINDOW)
+            self.counts[op] = 0
+        self.latencies[op].append(seconds)
+        self.counts[op] += 1
+
+    def stats(self):
+        """
+        Returns request counts and p50/p99 latencies in milliseconds
+        over the most recent requests of each operation.
+        """
+        stats = {}
+        for op, latencies in self.latencies.items():
+            ordered = sorted(latencies)
+            stats[op] = {
+                "count": self.counts[op],
+                "p50_ms": percentile(ordered, 50) * 1000,
+                "p99_ms": percentile(ordered, 99) * 1000,
+            }
+        return {"stats": stats}
+
+
+def percentile(ordered, p):
+    """
+    Returns the p-th percentile of an already sorted list.
+    """
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def _refreshed_graph(directory):
+    """
+    Applies the rows appended to the CSV files to a graph opened
+    separately from the snapshot and rewrites the snapshot.
+
+    Returns (the updated graph with its name index built, the set of
+    person indices whose co-stars changed). The graph is None if
+    nothing was appended, and both are None if the files were rewritten.
+    """
+    if snapshot_fingerprint(directory) == csv_fingerprint(directory):
+        return None, set()
+    updated = load_snapshot(directory, check=False)
+    if updated is None:
+        return None, None
+    touched = delta.refresh(updated, directory)
+    if touched is None:
+        return None, None
+    # Reopened from the new snapshot, names are already in sorted order
+    updated = load_snapshot(directory) or updated
+    updated.name_search
+    return updated, touched
+
+
+def _init_worker(directory):
+    global graph, tree_cache
+    if graph is None:
+        graph = load_graph(directory)
+    tree_cache = BFSTreeCache(graph)
+
+
+def _resolve(name):
+    return graph.resolve(name)
+
+
+def _shortest_path(source, target):
+    return tree_cache.shortest_path(source, target)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,10 @@
+import heapq
+import itertools
+import multiprocessing
+import sys
+from collections import deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
@@ -36,3 +43,102 @@ class QueueFrontier(StackFrontier):
             node = self.frontier[0]
             self.frontier = self.frontier[1:]
             return node
+
+
+class FastStackFrontier():
+    """
+    Stack frontier with O(1) `remove` and `contains_state`.
+
+    Nodes are kept in a list and popped from the end, and a count of
+    the states currently in the frontier answers `contains_state`.
+    """
+
+    def __init__(self):
+        self.frontier = []
+        self.states = {}
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self._pop()
+            self._forget(node.state)
+            return node
+
+    def _pop(self):
+        return self.frontier.pop()
+
+    def _forget(self, state):
+        count = self.states[state] - 1
+        if count:
+            self.states[state] = count
+        else:
+            del self.states[state]
+
+
+class FastQueueFrontier(FastStackFrontier):
+    """
+    Queue frontier backed by a deque, with O(1) `remove` and `contains_state`.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.frontier = deque()
+
+    def _pop(self):
+        return self.frontier.popleft()
+
+
+class PriorityFrontier(FastStackFrontier):
+    """
+    Frontier for weighted searches that removes the node with the
+    lowest priority first. Nodes added with equal priorities come
+    out in insertion order.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.counter = itertools.count()
+
+    def add(self, node, priority=0):
+        heapq.heappush(self.frontier, (priority, next(self.counter), node))
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def _pop(self):
+        return heapq.heappop(self.frontier)[2]
+
+
+def pool_context():
+    """
+    Returns the multiprocessing context for worker pools: fork where it
+    is available, so workers inherit data loaded before the pool starts.
+    """
+    return multiprocessing.get_context(
+        "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+    )
+
+
+def workers_option(args):
+    """
+    Removes `--workers N` from the argument list `args` and returns N,
+    or None if the option is absent.
+    """
+    if "--workers" not in args:
+        return None
+    position = args.index("--workers")
+    try:
+        workers = int(args[position + 1])
+    except (IndexError, ValueError):
+        sys.exit("--workers needs a number")
+    del args[position:position + 2]
+    return workers
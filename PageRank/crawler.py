@@ -0,0 +1,180 @@
+"""
+Parallel crawler with a cached link graph
+
+Pages are parsed on a pool of processes with the same link pattern as
+pagerank.crawl, matched a block at a time instead of over the whole
+file; a tag cut off at the end of a block is carried over to the next.
+The links found in every file are kept in a cache in the corpus
+directory along with the file's modification time and size, so a
+rerun only parses the files that changed since.
+"""
+import codecs
+import io
+import json
+import locale
+import multiprocessing
+import os
+import re
+import sys
+import time
+
+CACHE = "links.cache"
+CACHE_VERSION = 2
+BLOCK_SIZE = 1 << 16
+
+LINK = re.compile(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"")
+# The start of a link that the rest of the file could still complete
+PARTIAL = re.compile(r"<(?:a(?:\s[^>]*?(?:href=\"[^\"]*)?)?)?\Z")
+
+# Fewer files than this are parsed without starting a pool
+POOL_THRESHOLD = 64
+
+
+def main():
+    args = sys.argv[1:]
+    workers = None
+    if "--workers" in args:
+        position = args.index("--workers")
+        try:
+            workers = int(args[position + 1])
+        except (IndexError, ValueError):
+            sys.exit("--workers needs a number")
+        del args[position:position + 2]
+    use_cache = "--no-cache" not in args
+    args = [arg for arg in args if arg != "--no-cache"]
+    if len(args) != 1:
+        sys.exit("Usage: python crawler.py corpus [--workers N] [--no-cache]")
+
+    stats = {}
+    start = time.perf_counter()
+    pages = crawl(args[0], workers, use_cache, stats)
+    elapsed = time.perf_counter() - start
+    links = sum(len(targets) for targets in pages.values())
+    print(f"{len(pages)} pages, {links} links in {elapsed * 1000:.1f} ms "
+          f"({stats['parsed']} parsed, {stats['cached']} from cache)")
+
+
+def parse(path):
+    """
+    Returns the set of links in the HTML file at `path`, reading it a
+    block at a time. The links are those pagerank.crawl finds.
+    """
+    links = set()
+    # Decoded like a file opened in text mode, but without its buffering
+    decoder = io.IncrementalNewlineDecoder(
+        codecs.getincrementaldecoder(locale.getpreferredencoding(False))(), translate=True
+    )
+    with open(path, "rb", buffering=0) as f:
+        buffer = decoder.decode(f.read(BLOCK_SIZE))
+        while data := f.read(BLOCK_SIZE):
+            end = 0
+            for match in LINK.finditer(buffer):
+                links.add(match.group(1))
+                end = match.end()
+            partial = PARTIAL.search(buffer, end)
+            buffer = (buffer[partial.start():] if partial else "") + decoder.decode(data)
+        buffer += decoder.decode(b"", final=True)
+    links.update(LINK.findall(buffer))
+    return links
+
+
+def _parse_file(task):
+    filename, path = task
+    return filename, sorted(parse(path))
+
+
+def crawl(directory, workers=None, use_cache=True, stats=None):
+    """
+    Return a dictionary where each key is a page, and values are
+    the set of other pages in the corpus linked to by the page, like
+    pagerank.crawl.
+
+    Files whose modification time and size match the cache are not
+    read again. If `stats` is a dictionary, the numbers of files parsed
+    and taken from the cache are stored in it.
+    """
+    files, paths = {}, {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.endswith(".html") and entry.is_file():
+                status = entry.stat()
+                files[entry.name] = (status.st_mtime_ns, status.st_size)
+                paths[entry.name] = entry.path
+
+    cached = load_cache(directory) if use_cache else {}
+    links = {}
+    stale = []
+    for filename, stamp in files.items():
+        entry = cached.get(filename)
+        if entry is not None and entry[0] == stamp:
+            links[filename] = entry[1]
+        else:
+            stale.append((filename, paths[filename]))
+
+    workers = workers or multiprocessing.cpu_count()
+    if len(stale) < POOL_THRESHOLD or workers == 1:
+        links.update(map(_parse_file, stale))
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            links.update(pool.imap_unordered(_parse_file, stale, chunksize=16))
+
+    if use_cache and (stale or len(cached) != len(files)):
+        save_cache(directory, {filename: (files[filename], links[filename])
+                               for filename in files})
+    if stats is not None:
+        stats["parsed"] = len(stale)
+        stats["cached"] = len(files) - len(stale)
+
+    # Only include links to other pages in the corpus
+    return {
+        filename: {link for link in links[filename]
+                   if link in files and link != filename}
+        for filename in files
+    }
+
+
+def load_cache(directory):
+    """
+    Returns the cached links of `directory` as a dictionary mapping each
+    file name to ((mtime in ns, size), links), or an empty dictionary if
+    there is no usable cache.
+    """
+    try:
+        with open(os.path.join(directory, CACHE), encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+        return {}
+    names = data["names"]
+    return {
+        filename: ((mtime, size), [names[i] for i in targets])
+        for filename, (mtime, size, targets) in data["files"].items()
+    }
+
+
+def save_cache(directory, entries):
+    """
+    Writes the links of every file, as indexes into one table of link
+    names, to the cache. The file is replaced atomically.
+    """
+    names, index = [], {}
+    files = {}
+    for filename, ((mtime, size), targets) in entries.items():
+        encoded = []
+        for target in targets:
+            if target not in index:
+                index[target] = len(names)
+                names.append(target)
+            encoded.append(index[target])
+        files[filename] = [mtime, size, encoded]
+    path = os.path.join(directory, CACHE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        # json.dumps encodes in C, json.dump streams through Python
+        f.write(json.dumps({"version": CACHE_VERSION, "names": names, "files": files},
+                           separators=(",", ":")))
+    os.replace(path + ".tmp", path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Incremental PageRank after corpus changes
+
+After a few links or pages change, the old ranks are already close to
+the new ones. Starting the power iteration from them, instead of from
+the uniform distribution, reaches the same tolerance in fewer sweeps.
+"""
+import random
+import sys
+from collections import namedtuple
+
+import numpy as np
+
+import pagerank
+from crawler import crawl
+from matrix import TOLERANCE, LinkMatrix, power_iteration
+
+# The changed matrix, its ranks, the sweeps the warm start took, and
+# the sweeps a cold start took, if it was measured
+Update = namedtuple("Update", "matrix ranks sweeps cold_sweeps")
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python incremental.py corpus [changes]")
+    changes = int(sys.argv[2]) if len(sys.argv) == 3 else 10
+    matrix = LinkMatrix.from_corpus(crawl(sys.argv[1]))
+    ranks, sweeps = power_iteration(matrix, pagerank.DAMPING)
+    print(f"{len(matrix)} pages ranked in {sweeps} sweeps")
+
+    # Random edits: half new links, half removed ones
+    rng = random.Random(0)
+    added = [(rng.choice(matrix.pages), rng.choice(matrix.pages))
+             for _ in range(changes - changes // 2)]
+    removed = []
+    for _ in range(changes // 2):
+        source = rng.randrange(len(matrix))
+        links = matrix.links(source)
+        if len(links):
+            removed.append((matrix.pages[source], matrix.pages[rng.choice(links)]))
+
+    result = update(matrix, ranks, pagerank.DAMPING,
+                    added_links=added, removed_links=removed, compare=True)
+    print(f"After {len(added)} added and {len(removed)} removed links: "
+          f"{result.sweeps} sweeps from the old ranks, "
+          f"{result.cold_sweeps} from a cold start "
+          f"({result.cold_sweeps - result.sweeps} saved)")
+
+
+def update(matrix, ranks, damping_factor, added_pages=(), removed_pages=(),
+           added_links=(), removed_links=(), tolerance=TOLERANCE, compare=False):
+    """
+    Applies page and link changes to `matrix`, whose PageRank is
+    `ranks`, and refines the ranks from the old values until the total
+    change in a sweep falls below `tolerance`. With `compare=True` the
+    ranks are also computed from the uniform distribution, to count
+    the sweeps the warm start saved.
+
+    Returns an Update.
+    """
+    changed = matrix.with_changes(added_pages, removed_pages, added_links, removed_links)
+    start = warm_start(matrix, ranks, changed)
+    refined, sweeps = power_iteration(changed, damping_factor, tolerance, start=start)
+    cold_sweeps = None
+    if compare:
+        _, cold_sweeps = power_iteration(changed, damping_factor, tolerance)
+    return Update(changed, refined, sweeps, cold_sweeps)
+
+
+def warm_start(matrix, ranks, changed):
+    """
+    Returns the ranks of `matrix` carried over to the pages of
+    `changed`. New pages start at 1 / N, and the vector is scaled to
+    sum to 1.
+    """
+    n = len(changed)
+    start = np.full(n, 1 / n)
+    old = np.array([matrix.index.get(page, -1) for page in changed.pages], dtype=np.int64)
+    carried = old >= 0
+    start[carried] = ranks[old[carried]]
+    return start / start.sum()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+PageRank by power iteration over a compressed link matrix
+
+The corpus is stored once in compressed sparse row (CSR) form: the
+links of page i are targets[offsets[i]:offsets[i + 1]], as indexes
+into the sorted list of pages. Each sweep spreads every page's rank
+over its links with one NumPy bincount. Dangling pages, which link
+nowhere and so are treated as linking to every page, are not expanded
+into N links each: their rank is pooled and added to every page as a
+single rank-one correction.
+"""
+import sys
+
+import numpy as np
+
+import pagerank
+
+TOLERANCE = 1e-10
+MAX_SWEEPS = 1000
+
+# Largest difference check accepts from the exact solution, and from
+# pagerank.iterate_pagerank, which stops once no page changes by more
+# than 0.001 in a sweep and so is only that close to converged
+AGREEMENT = 1e-8
+REFERENCE_AGREEMENT = 0.01
+
+
+def main():
+    if len(sys.argv) != 2:
+        sys.exit("Usage: python matrix.py corpus")
+    corpus = pagerank.crawl(sys.argv[1])
+    ranks = iterate_pagerank(corpus, pagerank.DAMPING)
+    print("PageRank Results from Power Iteration")
+    for page in sorted(ranks):
+        print(f"  {page}: {ranks[page]:.4f}")
+    errors = check(corpus, pagerank.DAMPING)
+    for error in errors[:10]:
+        print(error)
+    if errors:
+        sys.exit(f"{len(errors)} ranks disagree with the reference solutions.")
+    print(f"Ranks agree with the exact solution to {AGREEMENT:g} "
+          f"and with pagerank.iterate_pagerank to {REFERENCE_AGREEMENT:g}.")
+
+
+class LinkMatrix():
+    """
+    Links of a corpus in CSR form, with page names sorted.
+    """
+
+    def __init__(self, pages, offsets, targets):
+        self.pages = pages
+        self.index = {page: i for i, page in enumerate(pages)}
+        self.offsets = offsets
+        self.targets = targets
+        self.out_degree = np.diff(offsets)
+        self.dangling = self.out_degree == 0
+        # Source page of every link, parallel to targets
+        self.sources = np.repeat(np.arange(len(pages), dtype=np.int32), self.out_degree)
+
+    @classmethod
+    def from_corpus(cls, corpus):
+        """
+        Builds the matrix of a corpus as returned by pagerank.crawl.
+        """
+        pages = sorted(corpus)
+        index = {page: i for i, page in enumerate(pages)}
+        offsets = np.zeros(len(pages) + 1, dtype=np.int64)
+        targets = []
+        for i, page in enumerate(pages):
+            links = sorted(index[link] for link in corpus[page])
+            targets.extend(links)
+            offsets[i + 1] = len(targets)
+        return cls(pages, offsets, np.array(targets, dtype=np.int32))
+
+    def __len__(self):
+        return len(self.pages)
+
+    def links(self, i):
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def with_changes(self, added_pages=(), removed_pages=(),
+                     added_links=(), removed_links=()):
+        """
+        Returns a new matrix with pages and (source, target) links added
+        and removed. Links touching removed pages go with them, and
+        links to pages outside the corpus or to the page itself are
+        ignored, as in pagerank.crawl.
+        """
+        removed_pages = set(removed_pages)
+        pages = sorted(set(self.pages) - removed_pages | set(added_pages))
+        index = {page: i for i, page in enumerate(pages)}
+        n = len(pages)
+
+        # Existing links, renumbered and keyed by source * n + target
+        remap = np.array([index.get(page, -1) for page in self.pages], dtype=np.int64)
+        sources, targets = remap[self.sources], remap[self.targets]
+        kept = (sources >= 0) & (targets >= 0)
+        keys = sources[kept] * n + targets[kept]
+
+        def encode(links):
+            return np.array([
+                index[source] * n + index[target] for source, target in links
+                if source in index and target in index and source != target
+            ], dtype=np.int64)
+
+        if removed_links:
+            keys = keys[~np.isin(keys, encode(removed_links))]
+        keys = np.unique(np.concatenate([keys, encode(added_links)]))
+
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // n, minlength=n), out=offsets[1:])
+        return LinkMatrix(pages, offsets, (keys % n).astype(np.int32))
+
+    def step(self, ranks, damping_factor):
+        """
+        Returns the ranks after one sweep of the PageRank update.
+        """
+        n = len(self.pages)
+        share = np.divide(ranks, self.out_degree, out=np.zeros(n), where=~self.dangling)
+        spread = np.bincount(self.targets, weights=share[self.sources], minlength=n)
+        pooled = ranks[self.dangling].sum() / n
+        return (1 - damping_factor) / n + damping_factor * (spread + pooled)
+
+    def to_dict(self, ranks):
+        return dict(zip(self.pages, ranks.tolist()))
+
+
+def power_iteration(matrix, damping_factor, tolerance=TOLERANCE, max_sweeps=MAX_SWEEPS,
+                    start=None):
+    """
+    Runs PageRank sweeps from `start`, or the uniform distribution,
+    until the total absolute change in rank falls below `tolerance`.
+
+    Returns the rank vector and the number of sweeps run.
+    """
+    n = len(matrix)
+    ranks = np.full(n, 1 / n) if start is None else start
+    for sweep in range(1, max_sweeps + 1):
+        updated = matrix.step(ranks, damping_factor)
+        residual = np.abs(updated - ranks).sum()
+        ranks = updated
+        if residual < tolerance:
+            break
+    return ranks, sweep
+
+
+def iterate_pagerank(corpus, damping_factor, tolerance=TOLERANCE):
+    """
+    Return PageRank values for each page, like pagerank.iterate_pagerank,
+    by power iteration over the corpus's link matrix.
+    """
+    matrix = LinkMatrix.from_corpus(corpus)
+    ranks, _ = power_iteration(matrix, damping_factor, tolerance)
+    return matrix.to_dict(ranks)
+
+
+def exact_pagerank(corpus, damping_factor):
+    """
+    Returns PageRank values for each page by solving the PageRank
+    equations directly with a dense N x N matrix.
+    """
+    matrix = LinkMatrix.from_corpus(corpus)
+    n = len(matrix)
+    # Column j holds the probabilities of moving from page j to each page
+    transitions = np.zeros((n, n))
+    transitions[matrix.targets, matrix.sources] = 1 / matrix.out_degree[matrix.sources]
+    transitions[:, matrix.dangling] = 1 / n
+    ranks = np.linalg.solve(np.eye(n) - damping_factor * transitions,
+                            np.full(n, (1 - damping_factor) / n))
+    return matrix.to_dict(ranks)
+
+
+def check(corpus, damping_factor):
+    """
+    Compares iterate_pagerank with exact_pagerank and with
+    pagerank.iterate_pagerank. Returns a list of messages for pages
+    differing by more than AGREEMENT from the first or by more than
+    REFERENCE_AGREEMENT from the second.
+    """
+    ranks = iterate_pagerank(corpus, damping_factor)
+    errors = []
+    for name, reference, tolerance in (
+        ("exact solution", exact_pagerank(corpus, damping_factor), AGREEMENT),
+        ("pagerank.iterate_pagerank", pagerank.iterate_pagerank(corpus, damping_factor),
+         REFERENCE_AGREEMENT),
+    ):
+        for page in sorted(corpus):
+            difference = abs(ranks[page] - reference[page])
+            if difference > tolerance:
+                errors.append(f"{page}: {ranks[page]:.10f} differs from the {name} "
+                              f"by {difference:.2g}")
+    return errors
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Vectorized random-surfer sampling for PageRank
+
+Thousands of independent surfers walk the corpus at once as a NumPy
+array of page indexes. Each step draws one uniform number per surfer:
+below the damping factor it follows a link, chosen by scaling the
+number into the page's slice of the CSR targets (found through the
+cumulative offsets), and otherwise it jumps to a random page. Pages
+without links always jump.
+
+Surfers are split into groups whose visit counts give independent
+estimates, so the spread between groups gives a confidence interval
+that narrows as the walk goes on.
+"""
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+import pagerank
+from matrix import LinkMatrix
+
+WALKERS = 16384
+GROUPS = 16
+BURN_IN = 20
+CHUNK_STEPS = 64
+
+# Rank estimates, the half-width of their 95% confidence interval,
+# and the number of samples counted so far
+Estimate = namedtuple("Estimate", "ranks margin samples")
+
+
+def main():
+    if len(sys.argv) not in (2, 3):
+        sys.exit("Usage: python sampling.py corpus [samples]")
+    corpus = pagerank.crawl(sys.argv[1])
+    samples = int(sys.argv[2]) if len(sys.argv) == 3 else 10000000
+    matrix = LinkMatrix.from_corpus(corpus)
+
+    start = time.perf_counter()
+    estimate = sample(matrix, pagerank.DAMPING, samples, seed=0)
+    elapsed = time.perf_counter() - start
+    print(f"PageRank Results from Sampling (n = {estimate.samples})")
+    for i, page in enumerate(matrix.pages):
+        print(f"  {page}: {estimate.ranks[i]:.4f} +/- {estimate.margin[i]:.4f}")
+    print(f"{estimate.samples / elapsed / 1e6:.1f} million steps/s")
+
+
+def walk(matrix, damping_factor, walkers=WALKERS, seed=None, groups=GROUPS,
+         burn_in=BURN_IN, chunk_steps=CHUNK_STEPS):
+    """
+    Walks `walkers` surfers from uniformly random pages and, after
+    `burn_in` uncounted steps, yields an Estimate every `chunk_steps`
+    steps. The walk goes on for as long as the generator is consumed.
+    """
+    if walkers % groups:
+        raise ValueError("walkers must split evenly into groups")
+    n = len(matrix)
+    rng = np.random.default_rng(seed)
+    offsets = matrix.offsets[:-1]
+    degree = matrix.out_degree.astype(np.float64)
+    follows = np.where(matrix.dangling, 0.0, damping_factor)
+    targets = matrix.targets
+
+    # Jumps reuse the part of the number above the damping factor, and
+    # dangling pages the whole of it, rescaled onto all pages
+    jump_scale = np.where(matrix.dangling, n, n / (1 - damping_factor))
+    jump_base = np.where(matrix.dangling, 0.0, damping_factor)
+
+    def step(positions):
+        u = rng.random(walkers)
+        follow = u < follows[positions]
+        moved = ((u - jump_base[positions]) * jump_scale[positions]).astype(np.int64)
+        chosen = positions[follow]
+        link = (u[follow] / damping_factor * degree[chosen]).astype(np.int64)
+        moved[follow] = targets[offsets[chosen] + link]
+        return np.minimum(moved, n - 1, out=moved)
+
+    positions = rng.integers(n, size=walkers)
+    for _ in range(burn_in):
+        positions = step(positions)
+
+    # Visits per group and page, one row of walkers per group
+    group_of = np.repeat(np.arange(groups, dtype=np.int64) * n, walkers // groups)
+    counts = np.zeros(groups * n, dtype=np.int64)
+    visited = np.empty((chunk_steps, walkers), dtype=np.int64)
+    steps = 0
+    while True:
+        for row in range(chunk_steps):
+            positions = step(positions)
+            visited[row] = positions + group_of
+        counts += np.bincount(visited.ravel(), minlength=groups * n)
+        steps += chunk_steps
+        yield estimate(counts.reshape(groups, n), steps * walkers)
+
+
+def estimate(counts, samples):
+    """
+    Returns the Estimate of per-group visit counts: the pooled visit
+    frequencies, with a margin of 1.96 standard errors of the group
+    means.
+    """
+    groups = len(counts)
+    frequencies = counts / counts.sum(axis=1, keepdims=True)
+    ranks = counts.sum(axis=0) / samples
+    margin = 1.96 * frequencies.std(axis=0, ddof=1) / np.sqrt(groups)
+    return Estimate(ranks, margin, samples)
+
+
+def sample(matrix, damping_factor, n, walkers=WALKERS, seed=None, margin=None):
+    """
+    Returns the Estimate after at least `n` counted samples, or earlier
+    once every page's margin is below `margin`, if given.
+    """
+    result = None
+    for result in walk(matrix, damping_factor, walkers, seed):
+        if result.samples >= n:
+            break
+        if margin is not None and result.margin.max() < margin:
+            break
+    return result
+
+
+def sample_pagerank(corpus, damping_factor, n, seed=None):
+    """
+    Return PageRank values for each page, like pagerank.sample_pagerank,
+    by walking many surfers at once for at least `n` samples in total.
+    """
+    matrix = LinkMatrix.from_corpus(corpus)
+    walkers = min(WALKERS, max(GROUPS, n // CHUNK_STEPS // GROUPS * GROUPS))
+    return matrix.to_dict(sample(matrix, damping_factor, n, walkers, seed).ranks)
+
+
+if __name__ == "__main__":
+    main()
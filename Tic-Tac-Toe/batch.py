@@ -0,0 +1,139 @@
+"""
+Batch Tic Tac Toe evaluation with NumPy
+
+Boards come either as an (N, 3, 3) integer grid, holding 1 for X, -1
+for O and 0 for an empty cell, or as an (N, 2) array of (x, o)
+bitboard masks laid out as in bitboard.py. Winners are looked up in a
+table indexed by (x << 9) | o, built once with the same line order as
+tictactoe.winner, so a batch costs a few array operations whatever its
+size.
+"""
+import itertools
+import sys
+import time
+from collections import namedtuple
+
+import numpy as np
+
+import tictactoe as ttt
+from bitboard import FULL
+
+# Grid codes of the cell contents, also the winner codes
+CODES = {ttt.X: 1, ttt.O: -1, ttt.EMPTY: 0}
+
+# Winner, terminal flag and utility per board, and the free cells as
+# an (N, 3, 3) boolean array. Winner codes match CODES, so they are
+# also the utilities.
+Evaluation = namedtuple("Evaluation", "winner terminal utility legal")
+
+
+def _winner_table():
+    # tictactoe.winner checks the rows, then the columns, each line X
+    # before O, then X on either diagonal before O on either diagonal.
+    # Filling lowest precedence first lets earlier lines overwrite.
+    masks = np.arange(1 << 18, dtype=np.uint32)
+    x, o = masks >> 9, masks & FULL
+    table = np.zeros(1 << 18, dtype=np.int8)
+    diagonals = [0b100010001, 0b001010100]
+    table[np.logical_or.reduce([o & line == line for line in diagonals])] = -1
+    table[np.logical_or.reduce([x & line == line for line in diagonals])] = 1
+    rows = [0b000000111 << 3 * i for i in range(3)]
+    columns = [0b001001001 << j for j in range(3)]
+    for line in reversed(rows + columns):
+        table[o & line == line] = -1
+        table[x & line == line] = 1
+    return table
+
+
+WINNERS = _winner_table()
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python batch.py [boards]")
+    count = int(sys.argv[1]) if len(sys.argv) == 2 else 1000000
+
+    mismatches = check()
+    if mismatches:
+        sys.exit(f"{mismatches} boards disagree with the scalar functions.")
+    print(f"Agrees with tictactoe on all {3 ** 9} boards.")
+
+    rng = np.random.default_rng(0)
+    grid = rng.integers(-1, 2, size=(count, 3, 3), dtype=np.int8)
+    masks = to_masks(grid)
+    for name, boards in (("grid", grid), ("masks", masks)):
+        start = time.perf_counter()
+        evaluate(boards)
+        elapsed = time.perf_counter() - start
+        print(f"  {name:<6} {count} boards {elapsed * 1000:8.1f} ms "
+              f"{count / elapsed / 1e6:6.1f} M boards/s")
+
+
+def from_boards(boards):
+    """
+    Returns the (N, 3, 3) grid of a sequence of list-of-lists boards.
+    """
+    return np.array([[[CODES[cell] for cell in row] for row in board]
+                     for board in boards], dtype=np.int8).reshape(-1, 3, 3)
+
+
+def to_masks(grid):
+    """
+    Returns the (N, 2) array of (x, o) masks of an (N, 3, 3) grid.
+    """
+    cells = np.asarray(grid).reshape(-1, 9)
+    masks = np.empty((len(cells), 2), dtype=np.uint16)
+    for column, code in enumerate((1, -1)):
+        packed = np.packbits(cells == code, axis=1, bitorder="little")
+        masks[:, column] = packed[:, 0] | packed[:, 1].astype(np.uint16) << 8
+    return masks
+
+
+def evaluate(boards):
+    """
+    Returns the Evaluation of a batch of boards, given as an (N, 3, 3)
+    grid or an (N, 2) array of masks.
+    """
+    boards = np.asarray(boards)
+    if boards.ndim == 3 and boards.shape[1:] == (3, 3):
+        masks = to_masks(boards)
+    elif boards.ndim == 2 and boards.shape[1] == 2:
+        masks = boards
+    else:
+        raise ValueError("boards must have shape (N, 3, 3) or (N, 2)")
+    x = masks[:, 0].astype(np.uint32)
+    o = masks[:, 1].astype(np.uint32)
+
+    winner = WINNERS[x << 9 | o]
+    terminal = (winner != 0) | ((x | o) == FULL)
+    free = (~(x | o) & FULL).astype("<u2")
+    legal = np.unpackbits(free.view(np.uint8).reshape(-1, 2), axis=1,
+                          bitorder="little")[:, :9].astype(bool)
+    return Evaluation(winner, terminal, winner.copy(), legal.reshape(-1, 3, 3))
+
+
+def check():
+    """
+    Compares evaluate with the scalar tictactoe functions on every
+    board of X, O and empty cells, and returns the number of mismatches.
+    """
+    boards = [
+        [list(cells[0:3]), list(cells[3:6]), list(cells[6:9])]
+        for cells in itertools.product((ttt.EMPTY, ttt.X, ttt.O), repeat=9)
+    ]
+    grid = from_boards(boards)
+    names = {1: ttt.X, -1: ttt.O, 0: None}
+    mismatches = 0
+    for evaluation in (evaluate(grid), evaluate(to_masks(grid))):
+        for board, winner, terminal, utility, legal in zip(boards, *evaluation):
+            free = {(i, j) for i in range(3) for j in range(3) if legal[i][j]}
+            if (names[winner] != ttt.winner(board)
+                    or terminal != ttt.terminal(board)
+                    or utility != ttt.utility(board)
+                    or free != ttt.actions(board)):
+                mismatches += 1
+    return mismatches
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import sys
+import time
+
+import bitboard
+import tictactoe as ttt
+from engine import Game, Searcher
+from stats import SearchStats
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python benchmark.py [moves]")
+    # Opening moves played before searching, to keep the run short
+    moves = int(sys.argv[1]) if len(sys.argv) == 2 else 1
+
+    board = ttt.initial_state()
+    for action in [(1, 1), (0, 0), (0, 1), (2, 1)][:moves]:
+        board = ttt.result(board, action)
+
+    for name, search in (("list of lists", search_lists),
+                         ("bitboard", search_bitboard)):
+        start = time.perf_counter()
+        nodes = search(board)
+        elapsed = time.perf_counter() - start
+        print(f"  {name:<14} {nodes:8} nodes {elapsed * 1000:9.1f} ms "
+              f"{elapsed / nodes * 1e9:8.0f} ns/node")
+
+    print("Search statistics")
+    for name, collector in compare_engines(board).items():
+        print(f"  {name:<14} {collector.summary()}")
+        print(f"  {'':<14} nodes per ply {collector.ply_nodes}")
+
+
+def search_lists(board):
+    """
+    Visits the whole game tree below `board` with the list-of-lists
+    functions and returns the number of nodes.
+    """
+    if ttt.terminal(board):
+        ttt.utility(board)
+        return 1
+    ttt.player(board)
+    return 1 + sum(search_lists(ttt.result(board, action))
+                   for action in ttt.actions(board))
+
+
+def search_bitboard(board):
+    """
+    Visits the same tree with the bitboard functions.
+    """
+    def visit(x, o):
+        if bitboard.terminal(x, o):
+            bitboard.utility(x, o)
+            return 1
+        bitboard.player(x, o)
+        return 1 + sum(visit(*bitboard.result(x, o, bit))
+                       for bit in bitboard.actions(x, o))
+
+    return visit(*bitboard.from_board(board))
+
+
+def compare_engines(board):
+    """
+    Solves `board` from empty transposition tables with tictactoe's
+    minimax and with the k-in-a-row engine, and returns the SearchStats
+    of each.
+    """
+    results = {}
+    ttt.transpositions.clear()
+    results["tictactoe"] = SearchStats()
+    ttt.minimax(board, results["tictactoe"])
+
+    game = Game()
+    results["engine"] = SearchStats()
+    Searcher(game, stats=results["engine"]).solve(*game.from_board(board))
+    return results
+
+
+if __name__ == "__main__":
+    main()
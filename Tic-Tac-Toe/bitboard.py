@@ -0,0 +1,221 @@
+"""
+Bitboard Tic Tac Toe engine
+
+A position is a pair of 9-bit integers (x, o): bit 3 * i + j of a mask
+is set when that player holds cell (i, j).
+"""
+from tictactoe import EMPTY, O, X
+
+FULL = 0b111111111
+
+# Masks of the 8 winning lines
+LINES = [
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+]
+
+# Bit of every cell, and the cell of every single-bit mask
+CELLS = [(i, j) for i in range(3) for j in range(3)]
+BITS = [1 << (3 * i + j) for i, j in CELLS]
+
+
+def _permutation(symmetry):
+    """
+    Returns a table mapping each 9-bit mask to its image under a
+    symmetry given as a map of cell (i, j).
+    """
+    table = []
+    for mask in range(FULL + 1):
+        image = 0
+        for cell, bit in enumerate(BITS):
+            if mask & bit:
+                ti, tj = symmetry(*CELLS[cell])
+                image |= 1 << (3 * ti + tj)
+        table.append(image)
+    return table
+
+
+# Mask images under the 8 rotations and reflections of the board,
+# and the inverse image tables
+SYMMETRIES = [
+    _permutation(symmetry) for symmetry in (
+        lambda i, j: (i, j),
+        lambda i, j: (j, 2 - i),
+        lambda i, j: (2 - i, 2 - j),
+        lambda i, j: (2 - j, i),
+        lambda i, j: (i, 2 - j),
+        lambda i, j: (2 - i, j),
+        lambda i, j: (j, i),
+        lambda i, j: (2 - j, 2 - i),
+    )
+]
+INVERSES = [
+    [table.index(mask) for mask in range(FULL + 1)] for table in SYMMETRIES
+]
+
+# Maps canonical (x, o) to (value for the side to move, best move bit
+# in canonical coordinates)
+transpositions = {}
+
+# Number of positions visited by negamax
+node_count = 0
+
+
+def from_board(board):
+    """
+    Returns the (x, o) masks of a list-of-lists board.
+    """
+    x, o = 0, 0
+    for (i, j), bit in zip(CELLS, BITS):
+        if board[i][j] == X:
+            x |= bit
+        elif board[i][j] == O:
+            o |= bit
+    return x, o
+
+
+def to_board(x, o):
+    """
+    Returns the list-of-lists board for (x, o) masks.
+    """
+    board = [[EMPTY, EMPTY, EMPTY] for _ in range(3)]
+    for (i, j), bit in zip(CELLS, BITS):
+        if x & bit:
+            board[i][j] = X
+        elif o & bit:
+            board[i][j] = O
+    return board
+
+
+def to_action(bit):
+    """
+    Returns the (i, j) action of a single-bit move.
+    """
+    return CELLS[bit.bit_length() - 1]
+
+
+def player(x, o):
+    """
+    Returns player who has the next turn.
+    """
+    return X if x.bit_count() == o.bit_count() else O
+
+
+def actions(x, o):
+    """
+    Yields the single-bit masks of the free cells.
+    """
+    free = FULL & ~(x | o)
+    while free:
+        bit = free & -free
+        yield bit
+        free ^= bit
+
+
+def result(x, o, bit):
+    """
+    Returns the (x, o) masks after the player to move takes `bit`.
+    """
+    if x.bit_count() == o.bit_count():
+        return x | bit, o
+    return x, o | bit
+
+
+def wins(mask):
+    """
+    Returns True if the mask holds a full line.
+    """
+    for line in LINES:
+        if mask & line == line:
+            return True
+    return False
+
+
+def winner(x, o):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    if wins(x):
+        return X
+    if wins(o):
+        return O
+    return None
+
+
+def terminal(x, o):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    return (x | o) == FULL or wins(x) or wins(o)
+
+
+def utility(x, o):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    if wins(x):
+        return 1
+    if wins(o):
+        return -1
+    return 0
+
+
+def canonical(x, o):
+    """
+    Returns (key, symmetry) where key is the smallest (x, o) image of
+    the position under the board symmetries and symmetry is the index
+    of the one used.
+    """
+    best = None
+    for symmetry, table in enumerate(SYMMETRIES):
+        key = (table[x], table[o])
+        if best is None or key < best[0]:
+            best = key, symmetry
+    return best
+
+
+def negamax(mine, theirs):
+    """
+    Returns (value, move bit) for the player owning `mine`, who is to
+    move: 1 for a forced win, -1 for a forced loss, 0 for a draw.
+    """
+    global node_count
+    node_count += 1
+    if wins(theirs):
+        return -1, None
+    free = FULL & ~(mine | theirs)
+    if not free:
+        return 0, None
+
+    key, symmetry = canonical(mine, theirs)
+    if key in transpositions:
+        value, move = transpositions[key]
+        return value, INVERSES[symmetry][move]
+
+    best, best_move = -2, None
+    while free:
+        bit = free & -free
+        free ^= bit
+        value = -negamax(theirs, mine | bit)[0]
+        if value > best:
+            best, best_move = value, bit
+            if best == 1:
+                break
+    transpositions[key] = (best, SYMMETRIES[symmetry][best_move])
+    return best, best_move
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on a list-of-lists
+    board, like tictactoe.minimax.
+    """
+    x, o = from_board(board)
+    if terminal(x, o):
+        return None
+    if player(x, o) == X:
+        _, move = negamax(x, o)
+    else:
+        _, move = negamax(o, x)
+    return to_action(move)
@@ -0,0 +1,173 @@
+"""
+Perfect-play opening book for 3 x 3 Tic Tac Toe
+
+Every reachable position is solved once and stored in a 3^9-byte file
+indexed by the board read as a base-3 number (empty 0, X 1, O 2), so
+answering minimax is a single lookup. Each byte holds the value for X
+plus one in its high bits and the optimal cell (3 * i + j) in its low
+four bits; terminal positions store cell 9 and unreachable ones 0xFF.
+"""
+import os
+import sys
+
+import bitboard
+import tictactoe as ttt
+
+BOOK = os.path.join(os.path.dirname(os.path.abspath(__file__)), "book.bin")
+NO_MOVE = 9
+UNREACHABLE = 0xFF
+
+# Book loaded by minimax, on first use
+book = None
+
+
+def main():
+    if len(sys.argv) != 2 or sys.argv[1] not in ("build", "check"):
+        sys.exit("Usage: python book.py build|check")
+    if sys.argv[1] == "build":
+        table = build()
+        save(table)
+        reachable = sum(entry != UNREACHABLE for entry in table)
+        print(f"Wrote {reachable} positions to {BOOK} ({len(table)} bytes)")
+    else:
+        errors = check(load())
+        for error in errors[:10]:
+            print(error)
+        if errors:
+            sys.exit(f"{len(errors)} positions disagree with the search engine.")
+        print("Book agrees with the search engine on every reachable position.")
+
+
+def index(board):
+    """
+    Returns the book index of a list-of-lists board.
+    """
+    key = 0
+    for row in board:
+        for cell in row:
+            key = 3 * key + (0 if cell == ttt.EMPTY else 1 if cell == ttt.X else 2)
+    return key
+
+
+def reachable_positions():
+    """
+    Yields every position reachable from the empty board, as (x, o) masks.
+    """
+    seen = {(0, 0)}
+    stack = [(0, 0)]
+    while stack:
+        x, o = stack.pop()
+        yield x, o
+        if bitboard.terminal(x, o):
+            continue
+        for bit in bitboard.actions(x, o):
+            child = bitboard.result(x, o, bit)
+            if child not in seen:
+                seen.add(child)
+                stack.append(child)
+
+
+def build():
+    """
+    Solves every reachable position and returns the book as a bytearray.
+    """
+    table = bytearray([UNREACHABLE]) * 3 ** 9
+    for x, o in reachable_positions():
+        board = bitboard.to_board(x, o)
+        if bitboard.terminal(x, o):
+            value, cell = bitboard.utility(x, o), NO_MOVE
+        else:
+            if bitboard.player(x, o) == ttt.X:
+                value, bit = bitboard.negamax(x, o)
+            else:
+                value, bit = bitboard.negamax(o, x)
+                value = -value
+            cell = bit.bit_length() - 1
+        table[index(board)] = (value + 1) << 4 | cell
+    return table
+
+
+def save(table, path=BOOK):
+    with open(path, "wb") as f:
+        f.write(table)
+
+
+def load(path=BOOK):
+    """
+    Returns the book stored at `path`, building and saving it first if
+    the file does not exist yet.
+    """
+    try:
+        with open(path, "rb") as f:
+            table = f.read()
+    except FileNotFoundError:
+        table = bytes(build())
+        save(table, path)
+    if len(table) != 3 ** 9:
+        raise ValueError(f"{path} is not a Tic Tac Toe book")
+    return table
+
+
+def lookup(board):
+    """
+    Returns (value for X, optimal action) for a board from the book.
+    The action is None for finished games.
+    """
+    global book
+    if book is None:
+        book = load()
+    entry = book[index(board)]
+    if entry == UNREACHABLE:
+        raise ValueError("position cannot be reached in a legal game")
+    cell = entry & 0x0F
+    return (entry >> 4) - 1, None if cell == NO_MOVE else divmod(cell, 3)
+
+
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    return lookup(board)[1]
+
+
+def check(table):
+    """
+    Verifies the book against tictactoe's minimax search. Returns a list
+    of messages for positions whose stored value or move is not optimal.
+    """
+    errors = []
+    for x, o in reachable_positions():
+        board = bitboard.to_board(x, o)
+        entry = table[index(board)]
+        if entry == UNREACHABLE:
+            errors.append(f"missing position {board}")
+            continue
+        value, cell = (entry >> 4) - 1, entry & 0x0F
+        if ttt.terminal(board):
+            if value != ttt.utility(board) or cell != NO_MOVE:
+                errors.append(f"wrong terminal entry for {board}")
+            continue
+        if ttt.player(board) == ttt.X:
+            expected, _ = ttt.maximising(board)
+        else:
+            expected, _ = ttt.minimising(board)
+        action = divmod(cell, 3)
+        if value != expected:
+            errors.append(f"value {value} instead of {expected} for {board}")
+        elif action not in ttt.actions(board):
+            errors.append(f"illegal move {action} for {board}")
+        else:
+            child = ttt.result(board, action)
+            if ttt.terminal(child):
+                reached = ttt.utility(child)
+            elif ttt.player(child) == ttt.X:
+                reached, _ = ttt.maximising(child)
+            else:
+                reached, _ = ttt.minimising(child)
+            if reached != expected:
+                errors.append(f"move {action} is not optimal for {board}")
+    return errors
+
+
+if __name__ == "__main__":
+    main()
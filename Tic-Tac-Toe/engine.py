@@ -0,0 +1,449 @@
+"""
+Generalized m x n, k-in-a-row engine
+
+A position is a pair of integers (x, o) where bit r * cols + c is set
+when that player holds cell (r, c). Searches work from the point of
+view of the player to move, on (mine, theirs) masks.
+"""
+import time
+from collections import namedtuple
+
+from tictactoe import EMPTY, O, X
+
+# Line directions: across, down, and both diagonals
+DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+# Transposition table bound types
+EXACT, LOWER, UPPER = 0, 1, 2
+
+INFINITY = float("inf")
+
+
+class Game():
+    """
+    Board geometry and rules for `rows` x `cols` boards won by `k` in a row.
+    """
+
+    def __init__(self, rows=3, cols=3, k=3):
+        if not 1 <= k <= max(rows, cols):
+            raise ValueError("win length must fit on the board")
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.size = rows * cols
+        self.full = (1 << self.size) - 1
+
+        # For every cell and direction, the bits of the k - 1 cells on
+        # each side of it, nearest first
+        self.rays = []
+        for cell in range(self.size):
+            r, c = divmod(cell, cols)
+            rays = []
+            for dr, dc in DIRECTIONS:
+                forward = self._ray(r, c, dr, dc)
+                backward = self._ray(r, c, -dr, -dc)
+                if len(forward) + len(backward) + 1 >= k:
+                    rays.append((forward, backward))
+            self.rays.append(rays)
+
+        # Every k-cell line, for winner checks on arbitrary positions
+        self.lines = []
+        for r in range(rows):
+            for c in range(cols):
+                for dr, dc in DIRECTIONS:
+                    end_r, end_c = r + dr * (k - 1), c + dc * (k - 1)
+                    if 0 <= end_r < rows and 0 <= end_c < cols:
+                        self.lines.append(sum(
+                            1 << ((r + dr * s) * cols + c + dc * s) for s in range(k)
+                        ))
+
+        # Cells ordered from the centre outwards, the default move order
+        self.center_order = sorted(
+            range(self.size),
+            key=lambda cell: (abs(cell // cols * 2 - (rows - 1))
+                              + abs(cell % cols * 2 - (cols - 1)), cell)
+        )
+
+    def _ray(self, r, c, dr, dc):
+        bits = []
+        for step in range(1, self.k):
+            rr, cc = r + dr * step, c + dc * step
+            if not (0 <= rr < self.rows and 0 <= cc < self.cols):
+                break
+            bits.append(1 << (rr * self.cols + cc))
+        return bits
+
+    def initial_state(self):
+        return 0, 0
+
+    def player(self, x, o):
+        """
+        Returns player who has the next turn.
+        """
+        return X if x.bit_count() == o.bit_count() else O
+
+    def actions(self, x, o):
+        """
+        Returns the free cells, centre first.
+        """
+        occupied = x | o
+        return [cell for cell in self.center_order if not occupied >> cell & 1]
+
+    def result(self, x, o, cell):
+        """
+        Returns the (x, o) masks after the player to move takes `cell`.
+        """
+        if x.bit_count() == o.bit_count():
+            return x | 1 << cell, o
+        return x, o | 1 << cell
+
+    def wins_at(self, mask, cell):
+        """
+        Returns True if `mask` has k in a row through `cell`. Only the
+        lines through the last move need checking after each move.
+        """
+        k = self.k
+        for forward, backward in self.rays[cell]:
+            count = 1
+            for bit in forward:
+                if not mask & bit:
+                    break
+                count += 1
+            for bit in backward:
+                if not mask & bit:
+                    break
+                count += 1
+            if count >= k:
+                return True
+        return False
+
+    def wins(self, mask):
+        """
+        Returns True if `mask` holds any k-cell line.
+        """
+        for line in self.lines:
+            if mask & line == line:
+                return True
+        return False
+
+    def winner(self, x, o):
+        if self.wins(x):
+            return X
+        if self.wins(o):
+            return O
+        return None
+
+    def terminal(self, x, o):
+        return (x | o) == self.full or self.wins(x) or self.wins(o)
+
+    def utility(self, x, o):
+        if self.wins(x):
+            return 1
+        if self.wins(o):
+            return -1
+        return 0
+
+    def from_board(self, board):
+        """
+        Returns the (x, o) masks of a list-of-lists board.
+        """
+        x, o = 0, 0
+        for r in range(self.rows):
+            for c in range(self.cols):
+                if board[r][c] == X:
+                    x |= 1 << (r * self.cols + c)
+                elif board[r][c] == O:
+                    o |= 1 << (r * self.cols + c)
+        return x, o
+
+    def to_board(self, x, o):
+        """
+        Returns the list-of-lists board for (x, o) masks.
+        """
+        board = [[EMPTY] * self.cols for _ in range(self.rows)]
+        for cell in range(self.size):
+            r, c = divmod(cell, self.cols)
+            if x >> cell & 1:
+                board[r][c] = X
+            elif o >> cell & 1:
+                board[r][c] = O
+        return board
+
+    def to_action(self, cell):
+        return divmod(cell, self.cols)
+
+
+class SearchTimeout(Exception):
+    """
+    Raised inside a search when its time or node budget runs out.
+    """
+
+
+# Result of an anytime search: the move to play, its score, the last
+# fully searched depth, the principal variation from the root, the
+# nodes visited, and whether the search proved the score exactly
+SearchResult = namedtuple("SearchResult", "move score depth pv nodes complete")
+
+
+def open_lines(game, mine, theirs):
+    """
+    Static evaluation for the player owning `mine`: lines still open to
+    only one player count for that player, weighted by the square of the
+    stones already in them. Scores lie strictly between -1 and 1, below
+    any decided game.
+    """
+    score = 0
+    for line in game.lines:
+        my_stones = (mine & line).bit_count()
+        their_stones = (theirs & line).bit_count()
+        if my_stones and not their_stones:
+            score += my_stones * my_stones
+        elif their_stones and not my_stones:
+            score -= their_stones * their_stones
+    return score / (abs(score) + game.k * game.k)
+
+
+class Searcher():
+    """
+    Alpha-beta negamax with a transposition table, killer moves and
+    the history heuristic.
+
+    Scores are from the point of view of the player to move: a win is
+    worth 1 + the number of cells still empty after it, so faster wins
+    score higher, a loss the negative of that, and a draw 0. Positions
+    cut off by a depth limit get the static evaluation, which always
+    lies strictly between -1 and 1.
+
+    Pass a stats.SearchStats as `stats` to collect search statistics;
+    without one, negamax runs unwrapped and only checks for it at
+    terminals, table hits and cutoffs.
+    """
+
+    # Nodes between checks of the time and node budgets
+    CHECK_INTERVAL = 256
+
+    def __init__(self, game, evaluate=open_lines, stats=None):
+        self.game = game
+        self.evaluate = evaluate
+        self.stats = stats
+        if stats is not None:
+            self.negamax = stats.timed(self.negamax)
+        self.table = {}
+        self.killers = {}
+        self.history = [0] * game.size
+        self.nodes = 0
+        self.deadline = None
+        self.node_limit = None
+        self.next_check = None
+
+    def solve(self, x, o):
+        """
+        Returns (score for the player to move, best cell) with perfect play.
+        """
+        if self.game.terminal(x, o):
+            return -1 if self.game.wins(x) or self.game.wins(o) else 0, None
+        mine, theirs = self._sides(x, o)
+        return self.negamax(mine, theirs, None, -INFINITY, INFINITY, 0, self.game.size)
+
+    def search(self, x, o, time_limit=None, node_limit=None, max_depth=None):
+        """
+        Iterative deepening under an optional wall-clock budget in seconds
+        and node budget. Searches depth 1, 2, ... until the game is
+        solved, a budget runs out or `max_depth` is reached, and returns
+        the SearchResult of the deepest completed iteration. If not even
+        depth 1 completes, the first move in search order is returned.
+        """
+        game = self.game
+        moves = game.actions(x, o)
+        if not moves or game.terminal(x, o):
+            return SearchResult(None, None, 0, [], 0, True)
+        mine, theirs = self._sides(x, o)
+        start_nodes = self.nodes
+        result = SearchResult(moves[0], None, 0, [moves[0]], 0, False)
+
+        self.deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        self.node_limit = self.nodes + node_limit if node_limit is not None else None
+        self.next_check = self._next_check() if self._budgeted() else None
+        try:
+            for depth in range(1, min(max_depth or len(moves), len(moves)) + 1):
+                score, move = self.negamax(mine, theirs, None, -INFINITY, INFINITY, 0, depth)
+                proven = depth >= len(moves) or abs(score) >= 1
+                result = SearchResult(move, score, depth,
+                                      self.principal_variation(mine, theirs, depth),
+                                      self.nodes - start_nodes, proven)
+                if proven:
+                    break
+        except SearchTimeout:
+            result = result._replace(nodes=self.nodes - start_nodes)
+        finally:
+            self.deadline = self.node_limit = self.next_check = None
+        return result
+
+    def principal_variation(self, mine, theirs, depth):
+        """
+        Returns the expected line of play from the transposition table.
+        """
+        pv = []
+        while len(pv) < depth:
+            entry = self.table.get((mine, theirs))
+            if entry is None or entry[2] is None:
+                break
+            cell = entry[2]
+            pv.append(cell)
+            if self.game.wins_at(mine | 1 << cell, cell):
+                break
+            mine, theirs = theirs, mine | 1 << cell
+        return pv
+
+    def _sides(self, x, o):
+        if self.game.player(x, o) == X:
+            return x, o
+        return o, x
+
+    def _budgeted(self):
+        return self.deadline is not None or self.node_limit is not None
+
+    def _check_budget(self):
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            raise SearchTimeout()
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchTimeout()
+        self.next_check = self._next_check()
+
+    def _next_check(self):
+        # Check again after CHECK_INTERVAL nodes, or sooner if the node
+        # budget runs out before then
+        if self.node_limit is not None:
+            return min(self.nodes + self.CHECK_INTERVAL, self.node_limit)
+        return self.nodes + self.CHECK_INTERVAL
+
+    def negamax(self, mine, theirs, last, alpha, beta, ply, depth):
+        """
+        Returns (score, cell) for the player owning `mine`, where `last`
+        is the cell the opponent just took, searching `depth` more plies.
+        The score is exact when it lies strictly between alpha and beta,
+        and a bound otherwise.
+        """
+        self.nodes += 1
+        if self.next_check is not None and self.nodes >= self.next_check:
+            self._check_budget()
+        game = self.game
+        occupied = mine | theirs
+        free = game.size - occupied.bit_count()
+        if last is not None and game.wins_at(theirs, last):
+            if self.stats is not None:
+                self.stats.terminals += 1
+            return -(free + 1), None
+        if free == 0:
+            if self.stats is not None:
+                self.stats.terminals += 1
+            return 0, None
+
+        # The best possible outcome is winning with the next move
+        if beta > free:
+            beta = free
+            if alpha >= beta:
+                return beta, None
+
+        # The game ends within `free` plies, so deeper limits are all
+        # the same search
+        depth = min(depth, free)
+        key = (mine, theirs)
+        entry = self.table.get(key)
+        table_move = None
+        if entry is not None:
+            value, bound, table_move, entry_depth = entry
+            if entry_depth >= depth:
+                if bound == EXACT:
+                    if self.stats is not None:
+                        self.stats.cache_hits += 1
+                    return value, table_move
+                if bound == LOWER and value > alpha:
+                    alpha = value
+                elif bound == UPPER and value < beta:
+                    beta = value
+                if alpha >= beta:
+                    if self.stats is not None:
+                        self.stats.cache_hits += 1
+                    return value, table_move
+
+        # Take an immediate win; otherwise an immediate threat by the
+        # opponent must be blocked, and two of them cannot be
+        moves = self.ordered_moves(occupied, ply, table_move)
+        threats = []
+        for cell in moves:
+            if game.wins_at(mine | 1 << cell, cell):
+                self.table[key] = (free, EXACT, cell, free)
+                return free, cell
+            if game.wins_at(theirs | 1 << cell, cell):
+                threats.append(cell)
+        if len(threats) > 1:
+            self.table[key] = (-(free - 1), EXACT, threats[0], free)
+            return -(free - 1), threats[0]
+        if threats:
+            moves = threats
+
+        if depth <= 0:
+            return self.evaluate(game, mine, theirs), None
+
+        original_alpha = alpha
+        best, best_move = -INFINITY, None
+        for cell in moves:
+            value = -self.negamax(theirs, mine | 1 << cell, cell,
+                                  -beta, -alpha, ply + 1, depth - 1)[0]
+            if value > best:
+                best, best_move = value, cell
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        self.remember_cutoff(cell, ply, free)
+                        if self.stats is not None:
+                            self.stats.cutoffs += 1
+                        break
+
+        if best <= original_alpha:
+            bound = UPPER
+        elif best >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.table[key] = (best, bound, best_move, depth)
+        return best, best_move
+
+    def ordered_moves(self, occupied, ply, table_move):
+        """
+        Returns the free cells: the table move first, then this ply's
+        killer moves, then the rest by history score and centrality.
+        """
+        game = self.game
+        free = [cell for cell in game.center_order if not occupied >> cell & 1]
+        history = self.history
+        free.sort(key=lambda cell: -history[cell])
+        first = [table_move] if table_move is not None else []
+        for killer in self.killers.get(ply, ()):
+            if killer != table_move and not occupied >> killer & 1:
+                first.append(killer)
+        if first:
+            free = first + [cell for cell in free if cell not in first]
+        return free
+
+    def remember_cutoff(self, cell, ply, free):
+        killers = self.killers.setdefault(ply, [])
+        if cell not in killers:
+            killers.insert(0, cell)
+            del killers[2:]
+        self.history[cell] += free * free
+
+
+def best_move(board, k=None):
+    """
+    Returns the optimal action (i, j) for the current player on a
+    list-of-lists board of any size. `k` defaults to the shorter side.
+    """
+    rows, cols = len(board), len(board[0])
+    game = Game(rows, cols, k or min(rows, cols))
+    x, o = game.from_board(board)
+    if game.terminal(x, o):
+        return None
+    _, cell = Searcher(game).solve(x, o)
+    return game.to_action(cell)
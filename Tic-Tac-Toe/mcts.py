@@ -0,0 +1,217 @@
+"""
+Monte Carlo Tree Search player for the k-in-a-row engine
+
+UCT picks moves in the tree, and each new leaf is scored by one random
+playout to the end of the game on the (x, o) masks. The tree is kept
+between moves: when the next search starts from a position already in
+it, that subtree becomes the new root along with all its statistics.
+"""
+import math
+import random
+import sys
+import time
+
+from engine import Game, Searcher
+
+
+def main():
+    args = sys.argv[1:]
+    options = {"--playouts": 2000, "--games": 10, "--seed": 0}
+    for option in options:
+        if option in args:
+            position = args.index(option)
+            try:
+                options[option] = int(args[position + 1])
+            except (IndexError, ValueError):
+                sys.exit(f"{option} needs a number")
+            del args[position:position + 2]
+    if len(args) not in (0, 3):
+        sys.exit("Usage: python mcts.py [rows cols k] "
+                 "[--playouts N] [--games N] [--seed N]")
+    game = Game(*map(int, args)) if args else Game()
+
+    stats = self_play(game, options["--games"], options["--playouts"], options["--seed"])
+    games = options["--games"]
+    print(f"{game.rows}x{game.cols}, k={game.k}: {games} games, "
+          f"{options['--playouts']} playouts per move")
+    print(f"  {stats['playouts'] / stats['seconds']:.0f} playouts/s")
+    print(f"  MCTS wins {stats['wins']}, draws {stats['draws']}, "
+          f"losses {stats['losses']} against minimax")
+
+
+class Node():
+    """
+    A position in the search tree, reached by `move`. `wins` counts
+    playout results for the player who made that move: 1 for a win,
+    0.5 for a draw.
+    """
+
+    def __init__(self, x, o, move, parent, untried, won):
+        self.x = x
+        self.o = o
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.untried = untried
+        self.won = won
+        self.visits = 0
+        self.wins = 0.0
+
+
+class MCTS():
+    """
+    UCT search over a Game, keeping its tree between moves.
+    """
+
+    def __init__(self, game, exploration=math.sqrt(2), seed=None):
+        self.game = game
+        self.exploration = exploration
+        self.random = random.Random(seed)
+        self.root = None
+        self.playouts = 0
+
+    def choose(self, x, o, playouts=None, time_limit=None):
+        """
+        Returns the cell to play from (x, o) after `playouts` playouts
+        or `time_limit` seconds, whichever comes first, running at least
+        one playout. With neither, 1000 playouts are run.
+        """
+        game = self.game
+        if game.terminal(x, o):
+            return None
+        if playouts is None and time_limit is None:
+            playouts = 1000
+        self.root = self._reuse(x, o) or self._node(x, o, None, None)
+        self.root.parent = None
+
+        deadline = time.perf_counter() + time_limit if time_limit is not None else None
+        # Always run one iteration, so the root has a child to choose
+        self._iterate(self.root)
+        done = 1
+        while playouts is None or done < playouts:
+            if deadline is not None and done % 64 == 0 and time.perf_counter() >= deadline:
+                break
+            self._iterate(self.root)
+            done += 1
+        self.playouts += done
+
+        best = max(self.root.children, key=lambda child: child.visits)
+        return best.move
+
+    def _reuse(self, x, o):
+        # The position is usually a grandchild of the last root: our
+        # move, then the opponent's reply
+        if self.root is None:
+            return None
+        frontier = [self.root]
+        for _ in range(3):
+            for node in frontier:
+                if node.x == x and node.o == o:
+                    return node
+            frontier = [child for node in frontier for child in node.children]
+        return None
+
+    def _node(self, x, o, move, parent):
+        game = self.game
+        won = move is not None and game.wins_at(x if (x >> move) & 1 else o, move)
+        untried = [] if won else game.actions(x, o)
+        self.random.shuffle(untried)
+        return Node(x, o, move, parent, untried, won)
+
+    def _iterate(self, root):
+        # Selection: descend by UCT while every move has been tried
+        node = root
+        while not node.untried and node.children:
+            node = self._select(node)
+
+        # Expansion
+        if node.untried:
+            move = node.untried.pop()
+            child = self._node(*self.game.result(node.x, node.o, move), move, node)
+            node.children.append(child)
+            node = child
+
+        # Simulation, scored for the player who moved into `node`
+        reward = self.playout(node)
+
+        # Backpropagation, alternating between the two players
+        while node is not None:
+            node.visits += 1
+            node.wins += reward
+            reward = 1 - reward
+            node = node.parent
+
+    def _select(self, node):
+        scale = self.exploration * math.sqrt(math.log(node.visits))
+        return max(node.children, key=lambda child: child.wins / child.visits
+                   + scale / math.sqrt(child.visits))
+
+    def playout(self, node):
+        """
+        Plays random moves from `node` to the end of the game. Returns
+        1 if the player who moved into `node` wins, 0.5 for a draw and
+        0 for a loss.
+        """
+        if node.won:
+            return 1
+        game = self.game
+        x, o = node.x, node.o
+        occupied = x | o
+        free = [cell for cell in range(game.size) if not occupied >> cell & 1]
+        self.random.shuffle(free)
+
+        # The player who moved into `node` is not the one to move now
+        mine, theirs = (x, o) if x.bit_count() == o.bit_count() else (o, x)
+        wins_at = game.wins_at
+        for turn, cell in enumerate(free):
+            mine |= 1 << cell
+            if wins_at(mine, cell):
+                return turn % 2
+            mine, theirs = theirs, mine
+        return 0.5
+
+
+def self_play(game, games, playouts, seed=0):
+    """
+    Plays `games` games between MCTS and the engine's minimax, which
+    alternate taking X. Minimax solves the position exactly on boards
+    of up to 16 cells and gets the time MCTS used for its move
+    otherwise.
+
+    Returns a dictionary with the MCTS wins, draws and losses, its
+    playouts and the seconds it spent on them.
+    """
+    stats = {"wins": 0, "draws": 0, "losses": 0, "playouts": 0, "seconds": 0.0}
+    for number in range(games):
+        player = MCTS(game, seed=seed + number)
+        searcher = Searcher(game)
+        mcts_side = number % 2
+        x, o = game.initial_state()
+        turn, spent = 0, 0.0
+        while not game.terminal(x, o):
+            if turn % 2 == mcts_side:
+                start = time.perf_counter()
+                cell = player.choose(x, o, playouts)
+                spent = time.perf_counter() - start
+                stats["seconds"] += spent
+            elif game.size <= 16:
+                _, cell = searcher.solve(x, o)
+            else:
+                cell = searcher.search(x, o, time_limit=max(spent, 0.05)).move
+            x, o = game.result(x, o, cell)
+            turn += 1
+        stats["playouts"] += player.playouts
+
+        utility = game.utility(x, o)
+        mcts_utility = utility if mcts_side == 0 else -utility
+        if mcts_utility > 0:
+            stats["wins"] += 1
+        elif mcts_utility < 0:
+            stats["losses"] += 1
+        else:
+            stats["draws"] += 1
+    return stats
+
+
+if __name__ == "__main__":
+    main()
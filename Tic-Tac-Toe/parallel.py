@@ -0,0 +1,196 @@
+"""
+Parallel root-split search for the k-in-a-row engine
+
+The first root move is searched in the parent to establish a bound,
+then the remaining root moves are handed to a pool of processes. The
+best score found so far lives in shared memory: every worker reads it
+as its alpha when it starts a move, raises it when it finds a better
+one, and polls it while searching. When another worker has raised it,
+the move is searched again with the narrower window, reusing the
+transposition table entries from the interrupted search. Each worker
+keeps its own Searcher, and with it its transposition table, across
+moves and searches.
+"""
+import multiprocessing
+import sys
+import time
+
+from engine import INFINITY, Game, Searcher, SearchTimeout
+
+# Per-process state, set by _init_worker in each pool process
+searcher = None
+shared_alpha = None
+
+
+def main():
+    args = sys.argv[1:]
+    counts = [1, 2, 4, 8]
+    if "--workers" in args:
+        position = args.index("--workers")
+        try:
+            counts = [int(count) for count in args[position + 1].split(",")]
+        except (IndexError, ValueError):
+            sys.exit("--workers needs a comma-separated list of numbers")
+        del args[position:position + 2]
+    if args:
+        sys.exit("Usage: python parallel.py [--workers 1,2,4,8]")
+
+    print(f"{multiprocessing.cpu_count()} CPUs available")
+    # Positions to measure: board, win length, opening moves, depth
+    positions = [
+        ("4x4, k=4 solved", Game(4, 4, 4), [5], None),
+        ("5x5, k=4 depth 7", Game(5, 5, 4), [12], 7),
+    ]
+    for name, game, opening, depth in positions:
+        x, o = game.initial_state()
+        for cell in opening:
+            x, o = game.result(x, o, cell)
+        print(name)
+        baseline = None
+        for workers in counts:
+            with ParallelSearcher(game, workers) as search:
+                start = time.perf_counter()
+                score, cell, nodes = search.search(x, o, depth)
+                elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"  {workers} workers {elapsed * 1000:9.1f} ms "
+                  f"speedup {baseline / elapsed:5.2f}  {nodes:8} nodes  "
+                  f"move {game.to_action(cell)} score {score:+.3f}")
+
+
+class ParallelSearcher():
+    """
+    Splits the root of an alpha-beta search over `workers` processes.
+    Use it as a context manager, or call close() to stop the pool.
+    """
+
+    def __init__(self, game, workers=None):
+        self.game = game
+        self.workers = workers or multiprocessing.cpu_count()
+        self.searcher = Searcher(game)
+        self.alpha = None
+        self.pool = None
+        if self.workers > 1:
+            # The game and the shared bound reach the workers through
+            # initargs, so any start method works
+            self.alpha = multiprocessing.Value("d", -INFINITY)
+            self.pool = multiprocessing.Pool(self.workers, initializer=_init_worker,
+                                             initargs=(game, self.alpha))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool.join()
+            self.pool = None
+
+    def search(self, x, o, depth=None):
+        """
+        Returns (score for the player to move, best cell, nodes visited)
+        searching `depth` plies, or to the end of the game by default.
+        """
+        game = self.game
+        if game.terminal(x, o):
+            return -1 if game.wins(x) or game.wins(o) else 0, None, 0
+        mine, theirs = self.searcher._sides(x, o)
+        depth = depth or game.size
+        if self.pool is None:
+            start = self.searcher.nodes
+            score, cell = self.searcher.negamax(mine, theirs, None, -INFINITY,
+                                                INFINITY, 0, depth)
+            return score, cell, self.searcher.nodes - start
+
+        moves = self.searcher.ordered_moves(mine | theirs, 0, None)
+        start = self.searcher.nodes
+        best, best_move = search_move(self.searcher, mine, theirs, moves[0],
+                                      -INFINITY, depth)
+        nodes = self.searcher.nodes - start
+        with self.alpha.get_lock():
+            self.alpha.value = best
+
+        # A score no higher than the alpha it was searched with is only
+        # an upper bound, so it can never replace the best exact score
+        tasks = [(mine, theirs, cell, depth) for cell in moves[1:]]
+        for cell, value, alpha, visited in self.pool.imap_unordered(
+                _search_root_move, tasks):
+            nodes += visited
+            if value > alpha and value > best:
+                best, best_move = value, cell
+        return best, best_move, nodes
+
+
+def search_move(searcher, mine, theirs, cell, alpha, depth):
+    """
+    Returns (score, cell) of the root move `cell` for the player owning
+    `mine`, fail-soft with respect to `alpha`.
+    """
+    value = -searcher.negamax(theirs, mine | 1 << cell, cell, -INFINITY, -alpha,
+                              1, depth - 1)[0]
+    return value, cell
+
+
+class BoundRaised(SearchTimeout):
+    """
+    Raised inside a worker's search when another worker has raised the
+    shared alpha above the one the search started with.
+    """
+
+
+class SharedBoundSearcher(Searcher):
+    """
+    A Searcher that polls the shared alpha at its budget checks, every
+    CHECK_INTERVAL nodes, while searching a root move.
+    """
+
+    def __init__(self, game, shared):
+        super().__init__(game)
+        self.shared = shared
+        self.alpha = -INFINITY
+
+    def search_move(self, mine, theirs, cell, depth):
+        """
+        Searches the root move `cell` from the current shared alpha,
+        starting again whenever another worker raises it. Returns the
+        score and the alpha it was searched with.
+        """
+        while True:
+            self.alpha = self.shared.value
+            self.next_check = self._next_check()
+            try:
+                value, _ = search_move(self, mine, theirs, cell, self.alpha, depth)
+                return value, self.alpha
+            except BoundRaised:
+                continue
+            finally:
+                self.next_check = None
+
+    def _check_budget(self):
+        super()._check_budget()
+        if self.shared.value > self.alpha:
+            raise BoundRaised()
+
+
+def _init_worker(game, alpha):
+    global searcher, shared_alpha
+    searcher = SharedBoundSearcher(game, alpha)
+    shared_alpha = alpha
+
+
+def _search_root_move(task):
+    mine, theirs, cell, depth = task
+    start = searcher.nodes
+    value, alpha = searcher.search_move(mine, theirs, cell, depth)
+    if value > alpha:
+        with shared_alpha.get_lock():
+            if value > shared_alpha.value:
+                shared_alpha.value = value
+    return cell, value, alpha, searcher.nodes - start
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,9 @@ import pygame
 import sys
 import time
 
+import bitboard
 import tictactoe as ttt
+from stats import SearchStats
 
 pygame.init()
 size = width, height = 600, 400
@@ -21,6 +23,10 @@ user = None
 board = ttt.initial_state()
 ai_turn = False
 
+# With --stats, the computer plays with tictactoe.minimax and logs its
+# search statistics after every move
+show_stats = "--stats" in sys.argv[1:]
+
 while True:
 
     for event in pygame.event.get():
@@ -112,7 +118,12 @@ while True:
         if user != player and not game_over:
             if ai_turn:
                 time.sleep(0.5)
-                move = ttt.minimax(board)
+                if show_stats:
+                    search_stats = SearchStats()
+                    move = ttt.minimax(board, search_stats)
+                    print(f"Move {move}: {search_stats.summary()}")
+                else:
+                    move = bitboard.minimax(board)
                 board = ttt.result(board, move)
                 ai_turn = False
             else:
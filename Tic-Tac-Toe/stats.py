@@ -0,0 +1,82 @@
+"""
+Opt-in search statistics
+
+A SearchStats collects node counts, terminal positions, cutoffs and
+transposition table hits, and the nodes and time spent at each ply.
+Searches only touch it when one is passed in. tictactoe.minimax then
+runs separate counted copies of its search functions, so a search
+without statistics runs code with no counting at all. The engine's
+Searcher wraps negamax for per-ply timing only when given one, and
+otherwise pays a None check at terminals, table hits and cutoffs.
+"""
+import time
+from functools import wraps
+
+
+class SearchStats():
+
+    def __init__(self):
+        self.nodes = 0
+        self.terminals = 0
+        self.cutoffs = 0
+        self.cache_hits = 0
+        self.ply_nodes = []
+        self.ply_seconds = []
+        self.ply = 0
+
+    def timed(self, search):
+        """
+        Returns `search` wrapped to count each call as a node at the
+        current ply and add its time, children included, to that ply.
+        """
+        @wraps(search)
+        def wrapper(*args):
+            ply = self.ply
+            if ply == len(self.ply_nodes):
+                self.ply_nodes.append(0)
+                self.ply_seconds.append(0.0)
+            self.nodes += 1
+            self.ply_nodes[ply] += 1
+            self.ply = ply + 1
+            start = time.perf_counter()
+            try:
+                return search(*args)
+            finally:
+                self.ply_seconds[ply] += time.perf_counter() - start
+                self.ply = ply
+        return wrapper
+
+    @property
+    def max_ply(self):
+        return len(self.ply_nodes) - 1
+
+    @property
+    def seconds(self):
+        return self.ply_seconds[0] if self.ply_seconds else 0.0
+
+    def self_seconds(self):
+        """
+        Returns the time spent at each ply excluding deeper plies.
+        """
+        deeper = self.ply_seconds[1:] + [0.0]
+        return [total - below for total, below in zip(self.ply_seconds, deeper)]
+
+    def as_dict(self):
+        return {
+            "nodes": self.nodes,
+            "terminals": self.terminals,
+            "cutoffs": self.cutoffs,
+            "cache_hits": self.cache_hits,
+            "max_ply": self.max_ply,
+            "seconds": self.seconds,
+            "ply_nodes": self.ply_nodes,
+            "ply_seconds": self.self_seconds(),
+        }
+
+    def summary(self):
+        """
+        Returns the statistics as one log line.
+        """
+        return (f"{self.nodes} nodes, {self.terminals} terminal, "
+                f"{self.cutoffs} cutoffs, {self.cache_hits} cache hits, "
+                f"max ply {self.max_ply}, {self.seconds * 1000:.1f} ms")
@@ -7,6 +7,21 @@ X = "X"
 O = "O"
 EMPTY = None
 
+# The 8 rotations and reflections of the board, as maps of cell (i, j)
+SYMMETRIES = [
+    lambda i, j: (i, j),
+    lambda i, j: (j, 2 - i),
+    lambda i, j: (2 - i, 2 - j),
+    lambda i, j: (2 - j, i),
+    lambda i, j: (i, 2 - j),
+    lambda i, j: (2 - i, j),
+    lambda i, j: (j, i),
+    lambda i, j: (2 - j, 2 - i),
+]
+
+# Maps canonical board keys to (value, best move in canonical coordinates)
+transpositions = {}
+
 
 def initial_state():
     """
@@ -117,43 +132,148 @@ def utility(board):
         return 0
 
 
+def canonical(board):
+    """
+    Returns (key, symmetry) where key encodes the board under the
+    symmetry that gives the smallest encoding. All 8 rotations and
+    reflections of a position share the same key.
+    """
+    best = None
+    for symmetry in SYMMETRIES:
+        cells = [None] * 9
+        for i in range(3) :
+            for j in range(3) :
+                ti, tj = symmetry(i, j)
+                cells[3 * ti + tj] = board[i][j] or "-"
+        key = "".join(cells)
+        if best is None or key < best[0] :
+            best = key, symmetry
+    return best
+
+
+def lookup(board) :
+    """
+    Returns the stored (value, move) for the board, with the move mapped
+    back from canonical coordinates, or None if it has not been searched.
+    """
+    key, symmetry = canonical(board)
+    if key not in transpositions :
+        return None
+    value, move = transpositions[key]
+    if move is None :
+        return value, None
+    for i in range(3) :
+        for j in range(3) :
+            if symmetry(i, j) == move :
+                return value, (i, j)
+
+
+def store(board, value, move) :
+    key, symmetry = canonical(board)
+    transpositions[key] = (value, None if move is None else symmetry(*move))
+
+
 def minimising(board) :
     if terminal(board) :
         return utility(board), None
+    stored = lookup(board)
+    if stored is not None :
+        return stored
     v, move = 2, None
     for action in actions(board) :
         value,_ = maximising(result(board,action))
         if value < v :
             v, move = value, action
             if v == -1 :
-                return v, move
+                break
+    store(board, v, move)
     return v, move
 
 
 def maximising(board) :
     if terminal(board) :
         return utility(board), None
+    stored = lookup(board)
+    if stored is not None :
+        return stored
     v, move = -2, None
     for action in actions(board) :
         value,_ = minimising(result(board,action))
         if value > v :
             v, move = value, action
             if v == 1 :
-                return v, move
-    return value, move
+                break
+    store(board, v, move)
+    return v, move
 
 
-def minimax(board):
+def minimax(board, collector=None):
     """
     Returns the optimal action for the current player on the board.
+    With a SearchStats `collector`, the search records its statistics
+    there.
     """
+    if collector is None :
+        maximise, minimise = maximising, minimising
+    else :
+        maximise, minimise = counted(collector)
     if terminal(board) :
         return None
     else :
         cur_player = player(board)
         if cur_player == X :
-            max_val, action = maximising(board)
+            max_val, action = maximise(board)
             return action
         elif cur_player == O :
-            min_val, action = minimising(board)
-            return action
\ No newline at end of file
+            min_val, action = minimise(board)
+            return action
+
+
+def counted(collector) :
+    """
+    Returns copies of maximising and minimising that record their
+    statistics in `collector`. They call each other rather than the
+    module's functions, which stay free of any counting, so several
+    searches with different collectors can run at once.
+    """
+    def minimising(board) :
+        if terminal(board) :
+            collector.terminals += 1
+            return utility(board), None
+        stored = lookup(board)
+        if stored is not None :
+            collector.cache_hits += 1
+            return stored
+        v, move = 2, None
+        for action in actions(board) :
+            value,_ = maximising(result(board,action))
+            if value < v :
+                v, move = value, action
+                if v == -1 :
+                    collector.cutoffs += 1
+                    break
+        store(board, v, move)
+        return v, move
+
+    def maximising(board) :
+        if terminal(board) :
+            collector.terminals += 1
+            return utility(board), None
+        stored = lookup(board)
+        if stored is not None :
+            collector.cache_hits += 1
+            return stored
+        v, move = -2, None
+        for action in actions(board) :
+            value,_ = minimising(result(board,action))
+            if value > v :
+                v, move = value, action
+                if v == 1 :
+                    collector.cutoffs += 1
+                    break
+        store(board, v, move)
+        return v, move
+
+    # The timed versions count the nodes and are what the recursion calls
+    maximising, minimising = collector.timed(maximising), collector.timed(minimising)
+    return maximising, minimising